@@ -0,0 +1,141 @@
+"""
+Синхронные и асинхронные представления новостей под ASGI.
+
+ASGI-приложение проекта вызывается в этом же процессе без сервера:
+на каждом уровне конкурентности одновременно выполняется заданное
+число запросов к главной и к странице новости, синхронным и
+асинхронным вариантами. Для каждой пары выводятся запросы в секунду,
+задержки p50/p95 и наибольшее число потоков процесса.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.asgi_load --concurrency 1,10,50,100
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.http_load import seed_news
+from benchmarks.utils import setup_django
+
+ROUTE_PAIRS = (
+    ('news:home', 'news:home_async'),
+    ('news:detail', 'news:detail_async'),
+)
+
+
+async def call(application, path):
+    """Один GET через ASGI-приложение, возвращает код ответа."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+async def measure(application, path, concurrency, requests):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], set()
+    peak_threads = threading.active_count()
+
+    async def one():
+        nonlocal peak_threads
+        async with semaphore:
+            start = time.perf_counter()
+            statuses.add(await call(application, path))
+            latencies.append(time.perf_counter() - start)
+            peak_threads = max(peak_threads, threading.active_count())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    cut_points = statistics.quantiles(latencies, n=100)
+    return {
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': cut_points[49] * 1000,
+        'p95_ms': cut_points[94] * 1000,
+        'threads': peak_threads,
+        'statuses': sorted(statuses),
+    }
+
+
+async def run(application, paths, levels, requests):
+    for sync_name, async_name in ROUTE_PAIRS:
+        for level in levels:
+            for name in (sync_name, async_name):
+                # Прогрев: кеш фрагментов, шаблоны и подключения.
+                await measure(application, paths[name], level, level + 1)
+                result = await measure(
+                    application, paths[name], level, requests
+                )
+                print(f'{name:<18} {level:>6} '
+                      f'{result["requests_per_second"]:>10.1f} '
+                      f'{result["p50_ms"]:>9.2f} {result["p95_ms"]:>9.2f} '
+                      f'{result["threads"]:>7} {result["statuses"]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--settings', default='yanews.settings_production')
+    parser.add_argument('--users', type=int, default=2)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments-per-news', type=int, default=30)
+    parser.add_argument('--concurrency', default='1,10,50,100',
+                        help='уровни конкурентности через запятую')
+    parser.add_argument('--requests', type=int, default=500,
+                        help='запросов на маршрут и уровень')
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / 'db.sqlite3'
+        setup_django('ya_news', args.settings, str(database))
+        from django.core.asgi import get_asgi_application
+        from django.core.management import call_command
+        from django.urls import reverse
+
+        from news.models import News
+
+        call_command('migrate', verbosity=0)
+        seed_news(args)
+        news = News.objects.first()
+        paths = {
+            'news:home': reverse('news:home'),
+            'news:home_async': reverse('news:home_async'),
+            'news:detail': reverse('news:detail', args=(news.pk,)),
+            'news:detail_async': reverse(
+                'news:detail_async', args=(news.pk,)
+            ),
+        }
+        print(f'{"маршрут":<18} {"клиентов":>6} {"запросов/с":>10} '
+              f'{"p50, мс":>9} {"p95, мс":>9} {"потоков":>7} коды')
+        asyncio.run(run(
+            get_asgi_application(), paths, levels, args.requests
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Сравнение проверки запрещённых слов циклом и скомпилированным выражением.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bad_words --text-length 2000
+"""
+import argparse
+import random
+import timeit
+
+from benchmarks.utils import setup_django
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+WORD_COUNTS = (10, 1_000, 10_000)
+
+
+def random_word(length):
+    return ''.join(random.choices(ALPHABET, k=length))
+
+
+def loop_search(text, words):
+    """Прежняя проверка из CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--text-length', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from news.bad_words import compile_bad_words
+
+    random.seed(args.seed)
+    # Текст без запрещённых слов — худший случай: проверяется весь список.
+    text = ' '.join(
+        random_word(7) for _ in range(args.text_length // 8)
+    ).upper()
+    print(f'{"слов":>8} {"сборка, мс":>12} {"цикл, мс":>10} '
+          f'{"выражение, мс":>15} {"ускорение":>10}')
+    for count in WORD_COUNTS:
+        words = tuple(
+            random_word(random.randint(8, 12)) for _ in range(count)
+        )
+        compile_time = timeit.timeit(
+            lambda: compile_bad_words.__wrapped__(words), number=1
+        )
+        pattern = compile_bad_words(words)
+        loop_time = timeit.timeit(
+            lambda: loop_search(text, words), number=args.repeat
+        ) / args.repeat
+        regex_time = timeit.timeit(
+            lambda: pattern.search(text.lower()), number=args.repeat
+        ) / args.repeat
+        print(f'{count:>8} {compile_time * 1000:>12.1f} '
+              f'{loop_time * 1000:>10.3f} {regex_time * 1000:>15.3f} '
+              f'{loop_time / regex_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,389 @@
+"""
+Нагрузочный замер всех именованных маршрутов news/urls.py и notes/urls.py.
+
+На временной (или переданной через --database) базе создаётся заданный
+объём данных, затем каждый маршрут вызывается через WSGI-приложение
+проекта в одном потоке и конкурентными клиентами. Результат —
+задержки p50/p95/p99, запросы в секунду и SQL-запросы на HTTP-запрос —
+выводится в JSON, чтобы сравнивать коммиты между собой.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.http_load ya_news --news 10000 --comments-per-news 100
+    python -m benchmarks.http_load ya_note --notes-per-user 100000
+"""
+import argparse
+import io
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.utils import ROOT_DIR, SETTINGS, setup_django
+
+BATCH_SIZE = 1000
+NEWS_PER_DAY = 10
+PERCENTILES = (50, 95, 99)
+
+Route = namedtuple('Route', ('name', 'path', 'cookie'))
+
+
+def seed_news(args):
+    """Новости с комментариями через штатный сервис загрузки."""
+    from django.contrib.auth import get_user_model
+
+    from news.services import ingest_news
+
+    get_user_model().objects.bulk_create(
+        get_user_model()(username=f'user{index}')
+        for index in range(args.users)
+    )
+    ingest_news((
+        {
+            'title': f'Новость {index}',
+            'text': 'Текст новости',
+            # По NEWS_PER_DAY новостей в день, чтобы архив охватывал годы.
+            'date': (date.today() - timedelta(
+                days=index // NEWS_PER_DAY
+            )).isoformat(),
+            'comments': [
+                {'author': f'user{number % args.users}',
+                 'text': f'Комментарий {number}'}
+                for number in range(args.comments_per_news)
+            ],
+        }
+        for index in range(args.news)
+    ), chunk_size=max(1, BATCH_SIZE // max(1, args.comments_per_news)))
+
+
+def seed_notes(args):
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+
+    for index in range(args.users):
+        author = get_user_model().objects.create(username=f'user{index}')
+        for start in range(0, args.notes_per_user, BATCH_SIZE):
+            Note.objects.bulk_create(
+                Note(title=f'Заметка {number}', text='Текст заметки',
+                     slug=f'user{index}-{number}', author=author)
+                for number in range(
+                    start, min(start + BATCH_SIZE, args.notes_per_user)
+                )
+            )
+
+
+def login_cookie(user):
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return f'{settings.SESSION_COOKIE_NAME}={session_key}'
+
+
+def news_routes():
+    from django.urls import reverse
+
+    from news.models import Comment, News
+
+    news = News.objects.first()
+    comment = Comment.objects.filter(news=news).select_related('author')[0]
+    cookie = login_cookie(comment.author)
+    return {
+        'news:home': Route('news:home', reverse('news:home'), ''),
+        'news:detail': Route(
+            'news:detail', reverse('news:detail', args=(news.pk,)), ''
+        ),
+        'news:comments': Route(
+            'news:comments', reverse('news:comments', args=(news.pk,)), ''
+        ),
+        'news:edit': Route(
+            'news:edit', reverse('news:edit', args=(comment.pk,)), cookie
+        ),
+        'news:delete': Route(
+            'news:delete', reverse('news:delete', args=(comment.pk,)), cookie
+        ),
+        'news:home_async': Route(
+            'news:home_async', reverse('news:home_async'), ''
+        ),
+        'news:detail_async': Route(
+            'news:detail_async',
+            reverse('news:detail_async', args=(news.pk,)), '',
+        ),
+        'news:archive_year': Route(
+            'news:archive_year',
+            reverse('news:archive_year', args=(news.date.year,)), '',
+        ),
+        'news:archive_month': Route(
+            'news:archive_month',
+            reverse('news:archive_month', args=(
+                news.date.year, news.date.month
+            )), '',
+        ),
+        'news:archive_day': Route(
+            'news:archive_day',
+            reverse('news:archive_day', args=(
+                news.date.year, news.date.month, news.date.day
+            )), '',
+        ),
+        'news:search': Route(
+            'news:search',
+            reverse('news:search') + '?' + urlencode({'q': 'новость 1'}),
+            '',
+        ),
+    }
+
+
+def notes_routes():
+    from django.urls import reverse
+
+    from notes.models import Note
+
+    note = Note.objects.select_related('author').first()
+    cookie = login_cookie(note.author)
+    routes = {
+        name: reverse(name)
+        for name in ('notes:home', 'notes:add', 'notes:list', 'notes:success')
+    }
+    routes['notes:search'] = (
+        reverse('notes:search') + '?' + urlencode({'q': 'текст заметки'})
+    )
+    routes.update({
+        name: reverse(name, args=(note.slug,))
+        for name in ('notes:edit', 'notes:detail', 'notes:delete')
+    })
+    return {
+        name: Route(name, path, cookie) for name, path in routes.items()
+    }
+
+
+PROJECTS = {
+    'ya_news': ('news.urls', seed_news, news_routes),
+    'ya_note': ('notes.urls', seed_notes, notes_routes),
+}
+
+
+class QueryCounter:
+    """
+    Считает SQL-запросы всех потоков процесса.
+
+    Обёртка ставится на каждое подключение при его создании, поэтому
+    учитываются и запросы асинхронных представлений из потоков
+    sync_to_async, а не только из потока клиента.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self.lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def wrap(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def install(self):
+        """Ставит обёртку на открытые подключения потока и на все новые."""
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        connection_created.connect(
+            self.wrap, weak=False, dispatch_uid='benchmarks.query_counter'
+        )
+        for connection in connections.all():
+            self.wrap(connection=connection)
+
+
+QUERIES = QueryCounter()
+
+
+def call(application, route):
+    """Один GET через WSGI-приложение, возвращает код ответа."""
+    path, _, query_string = route.path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'HTTP_HOST': 'localhost',
+        'HTTP_COOKIE': route.cookie,
+        'wsgi.input': io.BytesIO(),
+    }
+    setup_testing_defaults(environ)
+    status = []
+    response = application(
+        environ, lambda code, headers, exc_info=None: status.append(code)
+    )
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return int(status[0].split()[0])
+
+
+def run_client(application, route, requests):
+    """Серия запросов одного клиента: задержки и коды ответов."""
+    from django.db import close_old_connections
+
+    latencies, statuses = [], set()
+    for _ in range(requests):
+        start = time.perf_counter()
+        statuses.add(call(application, route))
+        latencies.append(time.perf_counter() - start)
+    close_old_connections()
+    return latencies, statuses
+
+
+def measure(application, route, clients, requests):
+    QUERIES.install()
+    queries = QUERIES.count
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(
+            lambda _: run_client(application, route, requests),
+            range(clients),
+        ))
+    elapsed = time.perf_counter() - start
+    latencies = [value for values, _ in results for value in values]
+    cut_points = statistics.quantiles(latencies, n=100)
+    report = {
+        f'p{share}_ms': round(cut_points[share - 1] * 1000, 3)
+        for share in PERCENTILES
+    }
+    report.update({
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'queries_per_request': round(
+            (QUERIES.count - queries) / len(latencies), 2
+        ),
+        'statuses': sorted(set().union(*(codes for _, codes in results))),
+    })
+    return report
+
+
+def compare(report, baseline):
+    """Изменения p95 и числа SQL-запросов относительно прошлого замера."""
+    lines = [f'сравнение с {baseline["revision"]}:']
+    for name, modes in report['routes'].items():
+        for mode, current in modes.items():
+            previous = baseline['routes'].get(name, {}).get(mode)
+            if previous is None:
+                continue
+            lines.append(
+                f'{name:<16} {mode:<11} p95 {previous["p95_ms"]:>9.3f} -> '
+                f'{current["p95_ms"]:>9.3f} мс, запросов '
+                f'{previous["queries_per_request"]} -> '
+                f'{current["queries_per_request"]}'
+            )
+    return '\n'.join(lines)
+
+
+def git_revision():
+    return subprocess.run(
+        ['git', 'rev-parse', '--short', 'HEAD'],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('project', choices=PROJECTS)
+    parser.add_argument('--settings', help='модуль настроек проекта')
+    parser.add_argument('--database',
+                        help='файл SQLite; уже заполненный не пересоздаётся')
+    parser.add_argument('--users', type=int, default=2)
+    parser.add_argument('--news', type=int, default=1000)
+    parser.add_argument('--comments-per-news', type=int, default=10)
+    parser.add_argument('--notes-per-user', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='запросов на маршрут в каждом режиме')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--output', help='файл для JSON вместо stdout')
+    parser.add_argument('--baseline',
+                        help='JSON прошлого замера для сравнения в stderr')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(args.database or Path(directory) / 'db.sqlite3')
+        seeded = database.exists()
+        settings_module = args.settings or SETTINGS[args.project]
+        setup_django(args.project, settings_module, str(database))
+        QUERIES.install()
+        from django.core.management import call_command
+        from django.core.wsgi import get_wsgi_application
+        from django.urls import get_resolver
+
+        urls_module, seed, build_routes = PROJECTS[args.project]
+        call_command('migrate', verbosity=0)
+        start = time.perf_counter()
+        if not seeded:
+            seed(args)
+        seed_seconds = time.perf_counter() - start
+
+        routes = build_routes()
+        urlconf = get_resolver(urls_module)
+        app_name = urlconf.urlconf_module.app_name
+        missing = {
+            f'{app_name}:{pattern.name}'
+            for pattern in urlconf.url_patterns
+        } - set(routes)
+        if missing:
+            sys.exit(f'Нет маршрута для замера: {", ".join(sorted(missing))}')
+
+        application = get_wsgi_application()
+        # Прогрев: шаблоны, кеш фрагментов и подключения.
+        for route in routes.values():
+            run_client(application, route, 3)
+        per_client = max(1, args.requests // args.clients)
+        report = {
+            'revision': git_revision(),
+            'project': args.project,
+            'settings': settings_module,
+            'volume': {
+                key: getattr(args, key) for key in (
+                    ('users', 'news', 'comments_per_news')
+                    if args.project == 'ya_news'
+                    else ('users', 'notes_per_user')
+                )
+            },
+            'seed_seconds': round(seed_seconds, 1),
+            'routes': {
+                name: {
+                    'sequential': measure(
+                        application, route, 1, args.requests
+                    ),
+                    'concurrent': measure(
+                        application, route, args.clients, per_client
+                    ),
+                }
+                for name, route in routes.items()
+            },
+        }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    else:
+        print(output)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        print(compare(report, baseline), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Полнотекстовый поиск по заметкам на большом объёме.
+
+На временной базе создаются заметки (по умолчанию миллион) со
+словами из словаря с распределением Ципфа: частые слова встречаются
+почти в каждой заметке, редкие — в единицах. Замеряются скорость
+вставки с поддержкой индекса триггерами, перестроение индекса и
+задержки поиска одного автора через FTS5 в сравнении с icontains.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.notes_search --notes 1000000 --authors 100
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from itertools import accumulate
+from pathlib import Path
+
+from benchmarks.utils import setup_django
+
+BATCH_SIZE = 5000
+VOCABULARY_SIZE = 20_000
+ALPHABET = 'абвгдежзиклмнопрстуфхцчшэюя'
+
+
+def make_vocabulary(size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(random.choices(ALPHABET, k=random.randint(4, 9))))
+    return sorted(words)
+
+
+def timed(func, repeat):
+    """Медиана и p95 времени вызова, мс."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return (statistics.median(durations),
+            durations[min(len(durations) - 1, int(len(durations) * 0.95))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=100)
+    parser.add_argument('--words-per-note', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / 'db.sqlite3'
+        setup_django('ya_note', 'yanote.settings_production', str(database))
+        from django.contrib.auth import get_user_model
+        from django.core.management import call_command
+        from django.db.models import Q
+
+        from notes.models import Note
+        from notes.search import rebuild_index, search_notes
+
+        call_command('migrate', verbosity=0)
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=f'user{index}')
+            for index in range(args.authors)
+        )
+        authors = list(get_user_model().objects.order_by('pk'))
+        vocabulary = make_vocabulary(VOCABULARY_SIZE)
+        cum_weights = list(accumulate(
+            1 / rank for rank in range(1, len(vocabulary) + 1)
+        ))
+
+        start = time.perf_counter()
+        for batch_start in range(0, args.notes, BATCH_SIZE):
+            batch_end = min(batch_start + BATCH_SIZE, args.notes)
+            Note.objects.bulk_create(
+                Note(
+                    title=' '.join(random.choices(
+                        vocabulary, cum_weights=cum_weights, k=3
+                    )),
+                    text=' '.join(random.choices(
+                        vocabulary, cum_weights=cum_weights,
+                        k=args.words_per_note
+                    )),
+                    slug=f'note-{number}',
+                    author=authors[number % len(authors)],
+                )
+                for number in range(batch_start, batch_end)
+            )
+        insert_seconds = time.perf_counter() - start
+        print(f'заметок: {args.notes}, авторов: {args.authors}, '
+              f'вставка с индексом: {args.notes / insert_seconds:.0f} '
+              f'строк/с, база: {database.stat().st_size / 2**20:.0f} МБ')
+
+        start = time.perf_counter()
+        rebuild_index()
+        print(f'перестроение индекса: {time.perf_counter() - start:.1f} с')
+
+        author = authors[0]
+        queries = {
+            'частое слово': vocabulary[0],
+            'среднее слово': vocabulary[500],
+            'редкое слово': vocabulary[-1],
+            'два слова': f'{vocabulary[3]} {vocabulary[40]}',
+            'префикс': vocabulary[200][:3],
+        }
+        print(f'{"запрос":<16} {"найдено":>8} {"FTS5 p50":>9} {"p95":>8} '
+              f'{"icontains p50":>14}')
+        for label, query in queries.items():
+            found = len(search_notes(author, query))
+            fts_median, fts_p95 = timed(
+                lambda: search_notes(author, query), args.repeat
+            )
+            scan = Note.objects.filter(author=author)
+            for term in query.split():
+                scan = scan.filter(
+                    Q(title__icontains=term) | Q(text__icontains=term)
+                )
+            scan_median, _ = timed(lambda: list(scan[:50]), 3)
+            print(f'{label:<16} {found:>8} {fts_median:>8.2f} '
+                  f'{fts_p95:>8.2f} {scan_median:>13.2f}  мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Задержка авторизованных запросов при разных хранилищах сессий.
+
+Каждое хранилище из SESSION_ENGINES замеряется в отдельном процессе
+(DJANGO_SESSION_BACKEND читается при загрузке настроек) на временной
+базе. Авторизованный клиент запрашивает страницу новости ya_news или
+список заметок ya_note через WSGI-приложение, затем столько же
+клиентов входят и не выходят; после этого видно, сколько строк
+накопилось в django_session до запуска clearsessions.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.session_backends ya_news --requests 500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.http_load import Route, measure
+from benchmarks.utils import setup_django
+
+BACKENDS = ('db', 'cached_db', 'signed_cookies')
+
+
+def authenticated_route(project):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+
+    user = get_user_model().objects.create(username='benchmark')
+    client = Client()
+    client.force_login(user)
+    cookie = '; '.join(
+        f'{name}={morsel.value}' for name, morsel in client.cookies.items()
+    )
+    if project == 'ya_news':
+        from news.models import News
+        news = News.objects.create(title='Замер', text='Текст')
+        return Route('news:detail', reverse('news:detail', args=(news.pk,)),
+                     cookie)
+    from notes.models import Note
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+             author=user)
+        for index in range(10)
+    )
+    return Route('notes:list', reverse('notes:list'), cookie)
+
+
+def run_backend(project, database, args):
+    """Замер одного хранилища, результат — словарь для JSON."""
+    setup_django(project, database_name=str(database))
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.contrib.sessions.models import Session
+    from django.core.management import call_command
+    from django.core.wsgi import get_wsgi_application
+    from django.test import Client
+
+    call_command('migrate', verbosity=0)
+    route = authenticated_route(project)
+    application = get_wsgi_application()
+    # Прогрев: шаблоны, кеш сессий и подключение.
+    measure(application, route, 1, 10)
+    result = {
+        'engine': settings.SESSION_ENGINE,
+        'route': route.name,
+        **measure(application, route, 1, args.requests),
+    }
+    # Входы без выхода: такие сессии остаются в базе до clearsessions.
+    user = get_user_model().objects.get(username='benchmark')
+    for _ in range(args.requests):
+        Client().force_login(user)
+    result['session_rows'] = Session.objects.count()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('project', choices=('ya_news', 'ya_note'))
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help='замерить одно хранилище и вывести JSON')
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ['DJANGO_SESSION_BACKEND'] = args.backend
+        with tempfile.TemporaryDirectory() as directory:
+            database = Path(directory) / 'db.sqlite3'
+            print(json.dumps(run_backend(args.project, database, args)))
+        return
+
+    print(f'{"хранилище":<16} {"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} '
+          f'{"запросов":>9} {"строк сессий":>13}')
+    for backend in BACKENDS:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.session_backends',
+             args.project, '--backend', backend,
+             '--requests', str(args.requests)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output)
+        print(f'{backend:<16} {result["p50_ms"]:>9} {result["p95_ms"]:>9} '
+              f'{result["p99_ms"]:>9} {result["queries_per_request"]:>9} '
+              f'{result["session_rows"]:>13}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Конкурентные вставки и чтение комментариев в SQLite по профилям настроек.
+
+Каждый профиль замеряется в отдельном процессе на временной базе:
+писатели создают Comment, читатели выбирают последние комментарии
+новости. После каждой операции вызывается close_old_connections, как
+в конце запроса, поэтому видна и разница в CONN_MAX_AGE.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.sqlite_concurrency --writers 4 --readers 8
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.utils import setup_django
+
+PROFILES = ('yanews.settings', 'yanews.settings_production')
+
+
+def percentile(values, share):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run_profile(settings_module, database, args):
+    """Замер одного профиля, результат — словарь для JSON."""
+    setup_django('ya_news', settings_module, database_name=str(database))
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import OperationalError, close_old_connections, connection
+
+    from news.models import Comment, News
+
+    call_command('migrate', verbosity=0)
+    author = get_user_model().objects.create(username='benchmark')
+    news = News.objects.create(title='Замер', text='Текст')
+    connection.close()
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = {'write': [], 'read': []}
+    errors = {'write': 0, 'read': 0}
+
+    def write():
+        Comment.objects.create(news=news, author=author, text='Текст')
+
+    def read():
+        list(Comment.objects.filter(news=news).order_by('-created')[:20])
+
+    def worker(kind, operation):
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                operation()
+            except OperationalError:
+                with lock:
+                    errors[kind] += 1
+            else:
+                with lock:
+                    latencies[kind].append(time.perf_counter() - start)
+            close_old_connections()
+        connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=('write', write))
+        for _ in range(args.writers)
+    ] + [
+        threading.Thread(target=worker, args=('read', read))
+        for _ in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    result = {'profile': settings_module}
+    for kind, values in latencies.items():
+        result[kind] = {
+            'ops_per_second': round(len(values) / args.duration, 1),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+            'errors': errors[kind],
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--profile', choices=PROFILES,
+                        help='замерить один профиль и вывести JSON')
+    args = parser.parse_args()
+
+    if args.profile:
+        with tempfile.TemporaryDirectory() as directory:
+            database = Path(directory) / 'db.sqlite3'
+            print(json.dumps(run_profile(args.profile, database, args)))
+        return
+
+    print(f'{"профиль":<28} {"вставок/с":>10} {"p95, мс":>9} '
+          f'{"чтений/с":>10} {"p95, мс":>9} {"ошибок":>7}')
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite_concurrency',
+             '--profile', profile, '--writers', str(args.writers),
+             '--readers', str(args.readers),
+             '--duration', str(args.duration)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output)
+        write, read = result['write'], result['read']
+        print(f'{profile:<28} {write["ops_per_second"]:>10} '
+              f'{write["p95_ms"]:>9} {read["ops_per_second"]:>10} '
+              f'{read["p95_ms"]:>9} {write["errors"] + read["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
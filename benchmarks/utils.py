@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SETTINGS = {
+    'ya_news': 'yanews.settings',
+    'ya_note': 'yanote.settings',
+}
+
+
+def setup_django(project, settings_module=None, database_name=None):
+    """
+    Подключает проект из репозитория и настраивает Django.
+
+    database_name подменяет файл базы, чтобы замеры не трогали рабочую.
+    Замер идёт в одном процессе, поэтому общий кеш боевого профиля
+    подменяется локальным и memcached для замеров не нужен.
+    """
+    sys.path.insert(0, str(ROOT_DIR / project))
+    os.environ['DJANGO_SETTINGS_MODULE'] = (
+        settings_module or SETTINGS[project]
+    )
+    import django
+    from django.conf import settings
+    if database_name is not None:
+        settings.DATABASES['default']['NAME'] = database_name
+    settings.CACHES = {
+        alias: {
+            **options,
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+        }
+        for alias, options in settings.CACHES.items()
+    }
+    django.setup()
@@ -0,0 +1,30 @@
+from django.urls import reverse
+
+# Строка больше любой строки с тем же началом: диапазон
+# [начало, начало + PREFIX_END) выбирает строки с этим началом по индексу.
+PREFIX_END = '\U0010ffff'
+
+
+class UsernamePrefixSearchMixin:
+    """
+    Поиск пользователя по началу имени в автодополнении админки.
+
+    Через автодополнение выбирается автор комментария или заметки. Начало
+    имени ищется диапазоном по уникальному индексу username: LIKE в
+    SQLite не учитывает регистр и индекс не использует, а стандартный
+    поиск ещё и по имени и email перебирает всю таблицу. В списке
+    пользователей поиск остаётся стандартным.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if request.path != reverse('admin:autocomplete'):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            username__gte=search_term,
+            username__lt=search_term + PREFIX_END,
+        ), False
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CommonConfig(AppConfig):
+    name = 'common'
+    verbose_name = 'Общие настройки проектов'
+
+    def ready(self):
+        from . import signals  # noqa: F401
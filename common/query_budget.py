@@ -0,0 +1,126 @@
+"""
+Бюджет SQL-запросов для тестов.
+
+Модуль общий для обоих проектов и не зависит от раннера: контекстный
+менеджер assert_query_budget используется в pytest-django через
+одноимённую фикстуру, а QueryBudgetMixin подключается к
+django.test.TestCase. При превышении бюджета в сообщение попадают все
+запросы, сгруппированные по месту вызова в коде проекта.
+
+Число запросов проверяется всегда. Время SQL зависит от машины, поэтому
+превышение лимита времени по умолчанию только выводится
+предупреждением, а ошибкой становится при QUERY_BUDGET_STRICT_TIME=1.
+"""
+import os
+import sys
+import time
+import warnings
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.template.base import Node
+
+QueryBudget = namedtuple('QueryBudget', ('max_queries', 'max_time'))
+RecordedQuery = namedtuple('RecordedQuery', ('sql', 'duration', 'call_site'))
+
+TEST_MODULES = ('test_', 'conftest')
+STRICT_TIME = os.environ.get('QUERY_BUDGET_STRICT_TIME') == '1'
+
+
+class QueryBudgetWarning(UserWarning):
+    """Блок превысил лимит времени SQL, но не лимит запросов."""
+
+
+class QueryRecorder:
+    """Обёртка над курсором, запоминающая запросы и их длительность."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(RecordedQuery(
+                sql, time.perf_counter() - start, self.get_call_site()
+            ))
+
+    @staticmethod
+    def get_call_site():
+        """
+        Ближайшее к запросу место вызова в проекте.
+
+        Запросы из шаблонов привязываются к строке шаблона, остальные — к
+        строке кода проекта вне тестов.
+        """
+        base_dir = str(settings.BASE_DIR)
+        fallback = None
+        frame = sys._getframe(1)
+        while frame is not None:
+            node = frame.f_locals.get('self')
+            filename = frame.f_code.co_filename
+            if issubclass(type(node), Node) and node.origin is not None:
+                return f'{node.origin.template_name}:{node.token.lineno}'
+            if filename.startswith(base_dir) and filename != __file__:
+                call_site = (f'{os.path.relpath(filename, base_dir)}:'
+                             f'{frame.f_lineno} in {frame.f_code.co_name}')
+                if not os.path.basename(filename).startswith(TEST_MODULES):
+                    return call_site
+                fallback = fallback or call_site
+            frame = frame.f_back
+        return fallback or 'неизвестное место вызова'
+
+    @property
+    def total_time(self):
+        return sum(query.duration for query in self.queries)
+
+    def report(self):
+        """Запросы, сгруппированные по месту вызова."""
+        groups = defaultdict(list)
+        for query in self.queries:
+            groups[query.call_site].append(query)
+        lines = []
+        for call_site, queries in groups.items():
+            lines.append(f'{call_site} — запросов: {len(queries)}')
+            lines.extend(
+                f'    [{query.duration * 1000:.2f} мс] {query.sql}'
+                for query in queries
+            )
+        return '\n'.join(lines)
+
+
+@contextmanager
+def assert_query_budget(budget, label='', using=DEFAULT_DB_ALIAS):
+    """Проверяет, что блок укладывается в бюджет запросов и времени SQL."""
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
+    count, total_time = len(recorder.queries), recorder.total_time
+    over_time = total_time > budget.max_time
+    if count <= budget.max_queries and not over_time:
+        return
+    message = (
+        f'{label}: {count} запросов (лимит {budget.max_queries}), '
+        f'{total_time * 1000:.2f} мс SQL '
+        f'(лимит {budget.max_time * 1000:.0f} мс)\n{recorder.report()}'
+    )
+    if count > budget.max_queries or STRICT_TIME:
+        raise AssertionError(message)
+    warnings.warn(message, QueryBudgetWarning, stacklevel=3)
+
+
+class QueryBudgetMixin:
+    """
+    Примесь для TestCase.
+
+    Бюджеты объявляются в атрибуте query_budgets по имени URL.
+    """
+    query_budgets = {}
+
+    def assert_url_budget(self, url_name, using=DEFAULT_DB_ALIAS):
+        return assert_query_budget(
+            self.query_budgets[url_name], label=url_name, using=using
+        )
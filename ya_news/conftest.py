@@ -0,0 +1,37 @@
+"""
+Отчёт о подготовке фикстур по тестам.
+
+Хуки лежат в корневом conftest: при запуске через pytest-xdist главный
+процесс не собирает тесты и conftest из каталога тестов не загружает,
+а отчёты о тестах приходят к нему от процессов-исполнителей.
+"""
+
+# Время подготовки фикстур каждого теста для отчёта в конце прогона.
+setup_durations = []
+
+
+def pytest_addoption(parser):
+    parser.addini(
+        'setup_durations', default='20',
+        help='Сколько самых долгих подготовок фикстур показать, 0 — все.'
+    )
+
+
+def pytest_runtest_logreport(report):
+    if report.when == 'setup':
+        setup_durations.append((report.duration, report.nodeid))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Отчёт о времени подготовки фикстур по тестам."""
+    if not setup_durations:
+        return
+    shown = int(config.getini('setup_durations')) or None
+    terminalreporter.write_sep('=', 'подготовка фикстур по тестам')
+    for duration, nodeid in sorted(setup_durations, reverse=True)[:shown]:
+        terminalreporter.write_line(f'{duration * 1000:9.2f} мс  {nodeid}')
+    total = sum(duration for duration, _ in setup_durations)
+    terminalreporter.write_line(
+        f'всего {total:.2f} с на {len(setup_durations)} тестов, '
+        f'в среднем {total / len(setup_durations) * 1000:.2f} мс'
+    )
@@ -1,15 +1,136 @@
 from django.contrib import admin
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.contenttypes.models import ContentType
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .models import Comment, News
+from common.admin import UsernamePrefixSearchMixin
+from .models import COMMENT_STR_LENGTH, Comment, News
+from .services import delete_comments, set_comments_approved
 
+# Сколько последних комментариев редактируется прямо в форме новости,
+# остальные доступны в списке комментариев.
+COMMENTS_COUNT_IN_NEWS_FORM = 20
 
-class CommentInline(admin.StackedInline):
+User = get_user_model()
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(UsernamePrefixSearchMixin, BaseUserAdmin):
+    """Автор комментария выбирается автодополнением по началу имени."""
+
+
+class LatestCommentsFormSet(BaseInlineFormSet):
+    """Формы только для последних комментариев новости."""
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset().select_related(
+                'author'
+            ).order_by('-created', '-pk')[:COMMENTS_COUNT_IN_NEWS_FORM]
+        return self._queryset
+
+
+class CommentInline(admin.TabularInline):
     model = Comment
+    formset = LatestCommentsFormSet
+    fields = ('author', 'text', 'is_approved', 'created')
+    readonly_fields = ('created',)
+    autocomplete_fields = ('author',)
     extra = 0
 
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
+    list_display = ('title', 'date', 'comments_count')
+    readonly_fields = ('comments_link',)
     inlines = [
         CommentInline,
     ]
+
+    @admin.display(description='Все комментарии')
+    def comments_link(self, news):
+        if news.pk is None:
+            return '-'
+        return format_html(
+            '<a href="{}?news__id__exact={}">Комментариев: {}</a>',
+            reverse('admin:news_comment_changelist'),
+            news.pk,
+            news.comments_count,
+        )
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    """
+    Модерация комментариев.
+
+    Список листается страницами по индексу на created, а скрытые
+    комментарии — по частичному индексу только для них; новость и автор
+    загружаются тем же запросом. Действия выполняются пачкой над всеми
+    выбранными комментариями, счётчики новостей пересчитываются одним
+    запросом.
+    """
+    list_display = ('__str__', 'news', 'author', 'created', 'is_approved')
+    list_select_related = ('news', 'author')
+    list_filter = ('is_approved', 'created')
+    list_per_page = 50
+    # Полный подсчёт комментариев рядом с отфильтрованным — ещё один
+    # COUNT(*) по всей таблице на каждую страницу.
+    show_full_result_count = False
+    raw_id_fields = ('news', 'author')
+    readonly_fields = ('created',)
+    ordering = ('-created',)
+    actions = ('approve_comments', 'disapprove_comments', 'delete_comments')
+
+    def get_actions(self, request):
+        """
+        Стандартное удаление заменено на delete_comments.
+
+        delete_selected загружает каждый комментарий, показывает их все на
+        странице подтверждения и обновляет счётчик новости по одному.
+        """
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Одобрить выбранные комментарии',
+                  permissions=('change',))
+    def approve_comments(self, request, queryset):
+        changed = set_comments_approved(queryset, True)
+        self.message_user(request, f'Одобрено комментариев: {changed}.')
+
+    @admin.action(description='Скрыть выбранные комментарии',
+                  permissions=('change',))
+    def disapprove_comments(self, request, queryset):
+        changed = set_comments_approved(queryset, False)
+        self.message_user(request, f'Скрыто комментариев: {changed}.')
+
+    @admin.action(description='Удалить выбранные комментарии',
+                  permissions=('delete',))
+    def delete_comments(self, request, queryset):
+        """
+        Удаление пачки, как и delete_selected, попадает в историю.
+
+        Записи истории собираются из ключей и начала текстов без загрузки
+        комментариев и сохраняются одним запросом.
+        """
+        content_type = ContentType.objects.get_for_model(self.model)
+        LogEntry.objects.bulk_create(
+            LogEntry(
+                user_id=request.user.pk,
+                content_type=content_type,
+                object_id=str(pk),
+                object_repr=text[:COMMENT_STR_LENGTH],
+                action_flag=DELETION,
+            )
+            for pk, text in queryset.values_list('pk', 'text')
+        )
+        deleted = delete_comments(queryset)
+        self.message_user(request, f'Удалено комментариев: {deleted}.')
@@ -0,0 +1,102 @@
+import os
+import re
+
+from django.conf import settings
+
+END = ''
+
+
+def build_trie(words):
+    """
+    Префиксное дерево слов.
+
+    Если одно слово — префикс другого, длинное слово не нужно: для поиска
+    запрещённых слов достаточно найти короткое.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            if END in node:
+                break
+            node = node.setdefault(char, {})
+        else:
+            node.clear()
+            node[END] = True
+    return trie
+
+
+def trie_to_regex(node):
+    """Регулярное выражение, совпадающее с любым словом из дерева."""
+    if END in node:
+        return ''
+    branches, chars = [], []
+    for char in sorted(node):
+        tail = trie_to_regex(node[char])
+        if tail:
+            branches.append(re.escape(char) + tail)
+        else:
+            chars.append(re.escape(char))
+    if len(chars) == 1:
+        branches.append(chars[0])
+    elif chars:
+        branches.append(f'[{"".join(chars)}]')
+    if len(branches) == 1:
+        return branches[0]
+    return f'(?:{"|".join(branches)})'
+
+
+def compile_bad_words(words):
+    """
+    Компилирует набор слов в одно регулярное выражение.
+
+    Выражение строится по префиксному дереву, поэтому при проверке текст
+    проходится один раз, а не по разу на каждое слово. Слова приводятся к
+    нижнему регистру, и искать нужно в тексте, приведённом к нему же:
+    флаг IGNORECASE заметно замедляет поиск.
+    """
+    words = {word.strip().lower() for word in words} - {''}
+    if not words:
+        return None
+    return re.compile(trie_to_regex(build_trie(words)))
+
+
+def load_bad_words(path):
+    """Читает слова из файла, по одному в строке, кроме комментариев."""
+    with open(path, encoding='utf-8') as file:
+        words = (line.strip() for line in file)
+        return tuple(
+            word for word in words if word and not word.startswith('#')
+        )
+
+
+# Скомпилированные выражения: для файла — по пути вместе со временем
+# изменения, для списка по умолчанию — по id вместе с самим списком.
+file_patterns = {}
+list_patterns = {}
+
+
+def get_bad_words_pattern(default_words):
+    """
+    Скомпилированный список запрещённых слов.
+
+    Если в настройках задан BAD_WORDS_FILE, слова берутся из файла и
+    перечитываются после его изменения. Выражение компилируется один раз
+    на источник, дальше проверка стоит одного поиска в словаре (и stat
+    файла).
+    """
+    path = getattr(settings, 'BAD_WORDS_FILE', None)
+    if path:
+        mtime = os.stat(path).st_mtime_ns
+        cached = file_patterns.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = file_patterns[path] = (
+                mtime, compile_bad_words(load_bad_words(path))
+            )
+        return cached[1]
+    cached = list_patterns.get(id(default_words))
+    if cached is None or cached[0] is not default_words:
+        cached = list_patterns[id(default_words)] = (
+            default_words, compile_bad_words(default_words)
+        )
+    return cached[1]
@@ -0,0 +1,42 @@
+import time
+
+from django.core.cache import cache
+
+NEWS_LIST_VERSION_KEY = 'news:list:version'
+NEWS_DETAIL_VERSION_KEY = 'news:detail:{}:version'
+# Период архива: год, месяц или день в виде начала даты ISO.
+NEWS_ARCHIVE_VERSION_KEY = 'news:archive:{}:version'
+
+
+def get_version(key):
+    """
+    Текущая версия закешированных данных.
+
+    Версия — время последнего изменения в наносекундах, поэтому после
+    вытеснения ключа из кеша она не совпадёт ни с одной из прежних.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Делает недействительными все фрагменты с прежней версией."""
+    cache.set(key, time.time_ns(), None)
+
+
+def get_archive_periods(news_date):
+    """Периоды архива (год, месяц и день), в которые попадает дата."""
+    day = news_date.isoformat()
+    return day[:4], day[:7], day
+
+
+def bump_archive_versions(dates):
+    """Сбрасывает кеш архива за все периоды перечисленных дат."""
+    periods = set()
+    for news_date in dates:
+        periods.update(get_archive_periods(news_date))
+    for period in periods:
+        bump_version(NEWS_ARCHIVE_VERSION_KEY.format(period))
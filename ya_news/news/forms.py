@@ -1,6 +1,7 @@
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
+from .bad_words import get_bad_words_pattern
 from .models import Comment
 
 BAD_WORDS = (
@@ -20,8 +21,7 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        pattern = get_bad_words_pattern(BAD_WORDS)
+        if pattern is not None and pattern.search(text.lower()):
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,88 @@
+import json
+import logging
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.models import News
+from news.services import ingest_news, logger
+
+REQUIRED_FIELDS = ('title', 'text')
+COMMENT_FIELDS = ('author', 'text')
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости с комментариями из ленты в формате JSON Lines: '
+        'по объекту с полями title, text, необязательной date (ГГГГ-ММ-ДД) '
+        'и необязательным списком comments из объектов с полями author '
+        '(имя пользователя) и text в каждой строке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу ленты.')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, path, chunk_size, **options):
+        handler = logging.StreamHandler(self.stdout)
+        if options['verbosity'] > 0:
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        try:
+            stats = ingest_news(self.read_feed(path), chunk_size=chunk_size)
+        finally:
+            logger.removeHandler(handler)
+        rate = (stats.news + stats.comments) / max(stats.seconds, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: новостей {stats.news}, комментариев {stats.comments}, '
+            f'дубликатов {stats.duplicates} за {stats.seconds:.1f} с '
+            f'({rate:.0f} строк/с).'
+        ))
+
+    def read_feed(self, path):
+        """Читает ленту построчно, пустые строки пропускаются."""
+        with open(path, encoding='utf-8') as file:
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    yield self.parse_record(number, line)
+
+    def parse_record(self, number, line):
+        """Запись из строки ленты; ошибка указывает номер строки."""
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise CommandError(f'Строка {number}: некорректный JSON: {error}')
+        if not isinstance(record, dict):
+            raise CommandError(f'Строка {number}: ожидается объект JSON.')
+        for field in REQUIRED_FIELDS:
+            if not isinstance(record.get(field), str):
+                raise CommandError(
+                    f'Строка {number}: поле {field} должно быть строкой.'
+                )
+        title_length = News._meta.get_field('title').max_length
+        if len(record['title']) > title_length:
+            raise CommandError(
+                f'Строка {number}: заголовок длиннее {title_length} символов.'
+            )
+        if record.get('date') is not None:
+            try:
+                date.fromisoformat(record['date'])
+            except (TypeError, ValueError):
+                raise CommandError(
+                    f'Строка {number}: дата должна быть в формате ГГГГ-ММ-ДД.'
+                )
+        self.check_comments(number, record.get('comments', []))
+        return record
+
+    def check_comments(self, number, comments):
+        """Комментарии — список объектов со строковыми author и text."""
+        if not isinstance(comments, list) or not all(
+            isinstance(comment, dict)
+            and all(isinstance(comment.get(field), str)
+                    for field in COMMENT_FIELDS)
+            for comment in comments
+        ):
+            raise CommandError(
+                f'Строка {number}: comments должен быть списком объектов '
+                f'со строковыми полями author и text.'
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import NEWS_LIST_VERSION_KEY, bump_version
+from news.services import recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев новостей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        fixed = recount_comments(batch_size=batch_size)
+        if fixed:
+            bump_version(NEWS_LIST_VERSION_KEY)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков: {fixed}.'
+        ))
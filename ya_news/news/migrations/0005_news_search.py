@@ -0,0 +1,71 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    # Внешнее содержимое: FTS5 хранит только индекс, тексты читаются из
+    # news_news по rowid = id. Префиксные индексы ускоряют поиск по
+    # началу слова.
+    """
+    CREATE VIRTUAL TABLE news_news_search USING fts5(
+        title, text,
+        content='news_news', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER news_news_search_insert AFTER INSERT ON news_news
+    BEGIN
+        INSERT INTO news_news_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_search_delete AFTER DELETE ON news_news
+    BEGIN
+        INSERT INTO news_news_search(
+            news_news_search, rowid, title, text
+        ) VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_search_update
+    AFTER UPDATE OF title, text ON news_news
+    BEGIN
+        INSERT INTO news_news_search(
+            news_news_search, rowid, title, text
+        ) VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO news_news_search(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    "INSERT INTO news_news_search(news_news_search) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS news_news_search_insert',
+    'DROP TRIGGER IF EXISTS news_news_search_delete',
+    'DROP TRIGGER IF EXISTS news_news_search_update',
+    'DROP TABLE IF EXISTS news_news_search',
+)
+
+
+def run_on_sqlite(statements):
+    """FTS5 есть только в SQLite, на других базах миграция пустая."""
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_news_comments_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.15 on 2026-10-18 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_approved',
+            field=models.BooleanField(default=True, help_text='Неодобренные комментарии скрыты со страницы новости.', verbose_name='Одобрен'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_approved', False)), fields=['created'], name='comment_hidden_created_idx'),
+        ),
+    ]
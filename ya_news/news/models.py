@@ -1,22 +1,68 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 
 from django.conf import settings
 from django.db import models
 
+# Длина начала текста, которым комментарий представлен в админке.
+COMMENT_STR_LENGTH = 50
+# Сигналы удаления комментариев не трогают счётчики и кеш новостей,
+# пока комментарии удаляются каскадом вместе с новостями или пачкой:
+# удалённым новостям это не нужно, а после пачки счётчики
+# пересчитываются одним запросом.
+comment_signals_muted = ContextVar('comment_signals_muted', default=False)
+
+
+@contextmanager
+def mute_comment_signals():
+    token = comment_signals_muted.set(True)
+    try:
+        yield
+    finally:
+        comment_signals_muted.reset(token)
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def delete(self):
+        with mute_comment_signals():
+            return super().delete()
+
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', 'id'), name='news_date_id_idx'),
+            models.Index(fields=('title', 'date'), name='news_title_date_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def delete(self, *args, **kwargs):
+        with mute_comment_signals():
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем дату, чтобы сбросить кеш архива за прежний период."""
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_date = instance.__dict__.get('date')
+        return instance
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -29,9 +75,33 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    is_approved = models.BooleanField(
+        'Одобрен', default=True,
+        help_text='Неодобренные комментарии скрыты со страницы новости.'
+    )
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+            # Список комментариев в админке и его фильтры. Скрытых
+            # комментариев мало, частичный индекс хранит только их.
+            models.Index(fields=('created',), name='comment_created_idx'),
+            models.Index(
+                fields=('created',), condition=models.Q(is_approved=False),
+                name='comment_hidden_created_idx'
+            ),
+        )
 
     def __str__(self):
-        return self.text[:50]
+        return self.text[:COMMENT_STR_LENGTH]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем новость и одобрение, чтобы поправить счётчики."""
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_news_id = instance.__dict__.get('news_id')
+        instance.loaded_is_approved = instance.__dict__.get('is_approved')
+        return instance
@@ -0,0 +1,106 @@
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Comment
+
+CURSOR_SEPARATOR = '_'
+# Наибольший первичный ключ: больший не поместится в целое базы данных.
+MAX_CURSOR_PK = 2 ** 63 - 1
+
+
+def encode_cursor(comment):
+    """Курсор указывает на последний показанный комментарий."""
+    return f'{comment.created.isoformat()}{CURSOR_SEPARATOR}{comment.pk}'
+
+
+def decode_cursor_pk(pk):
+    """Первичный ключ из курсора, вне диапазона ключей — ValueError."""
+    pk = int(pk)
+    if not 0 < pk <= MAX_CURSOR_PK:
+        raise ValueError(f'Ключ курсора вне диапазона: {pk}.')
+    return pk
+
+
+def decode_cursor(cursor):
+    """
+    Разбирает курсор на пару (created, id).
+
+    Для некорректного курсора выбрасывает ValueError.
+    """
+    created, _, pk = cursor.rpartition(CURSOR_SEPARATOR)
+    return datetime.fromisoformat(created), decode_cursor_pk(pk)
+
+
+def get_comments_page(news_id, cursor=None, limit=None):
+    """
+    Возвращает страницу комментариев к новости и курсор следующей страницы.
+
+    Пагинация keyset по (created, id): вместо OFFSET страница начинается
+    сразу за курсором, поэтому стоимость запроса не зависит от того,
+    насколько далеко пролистан список.
+    """
+    if limit is None:
+        limit = settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    comments = Comment.objects.filter(
+        news_id=news_id, is_approved=True
+    ).select_related('author').order_by('created', 'pk')
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        comments = comments.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    page = list(comments[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def encode_news_cursor(news):
+    """Курсор указывает на последнюю показанную новость."""
+    return f'{news.date.isoformat()}{CURSOR_SEPARATOR}{news.pk}'
+
+
+def decode_news_cursor(cursor):
+    """
+    Разбирает курсор новости на пару (date, id).
+
+    Для некорректного курсора выбрасывает ValueError.
+    """
+    news_date, _, pk = cursor.rpartition(CURSOR_SEPARATOR)
+    return date.fromisoformat(news_date), decode_cursor_pk(pk)
+
+
+def get_news_page(news, cursor=None, limit=None, until=None):
+    """
+    Возвращает страницу новостей и курсор следующей страницы.
+
+    Новости идут от свежих к старым, порядок (-date, id) совпадает с
+    индексом news_date_id_idx, поэтому страница читается из индекса
+    сразу за курсором, без OFFSET и без сортировки. Для результатов
+    поиска сортируются только найденные новости.
+
+    Верхняя граница периода until (не включая) передаётся отдельно:
+    SQLite сужает диапазон индекса только по одной верхней границе, и
+    курсор должен её заменять, а не дополнять.
+    """
+    if limit is None:
+        limit = settings.NEWS_COUNT_ON_ARCHIVE_PAGE
+    news = news.order_by('-date', 'pk')
+    if cursor:
+        news_date, pk = decode_news_cursor(cursor)
+        if until is None or news_date < until:
+            # Условие с OR индекс не сужает, поэтому дата курсора
+            # становится верхней границей, а новости той же даты до
+            # курсора отбрасываются отдельно.
+            news = news.filter(date__lte=news_date).exclude(
+                date=news_date, pk__lte=pk
+            )
+            until = None
+    if until is not None:
+        news = news.filter(date__lt=until)
+    page = list(news[:limit + 1])
+    next_cursor = (
+        encode_news_cursor(page[limit - 1]) if len(page) > limit else None
+    )
+    return page[:limit], next_cursor
@@ -1,50 +1,121 @@
+from copy import deepcopy
 from datetime import timedelta
 
 import pytest
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.test.client import Client
 from django.urls import reverse
 from django.utils import timezone
 
+from common import query_budget
 from news.models import Comment, News
 
+COMMENTS_PER_NEWS = 30
+COMMENTS_FOR_PAGINATION = 5
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш не должен переживать откат базы данных между тестами."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(scope='module')
+def module_db(django_db_setup, django_db_blocker):
+    """
+    Транзакция на время модуля — аналог setUpTestData.
+
+    Транзакции тестов становятся точками сохранения внутри неё, поэтому
+    данные фикстур уровня модуля видны каждому тесту и откатываются
+    после модуля. Доступ к базе открывается только на время создания и
+    отката.
+    """
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+    yield django_db_blocker
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
+@pytest.fixture(scope='module')
+def module_users(module_db):
+    """Автор и пользователь с cookie их сессий, один раз на модуль."""
+    users = {}
+    with module_db.unblock():
+        for key, username in (('author', 'Автор'), ('user', 'Юзер')):
+            user = get_user_model().objects.create(username=username)
+            client = Client()
+            client.force_login(user)
+            users[key] = (user, client.cookies)
+    return users
+
+
+@pytest.fixture(scope='module')
+def module_news(module_db):
+    """Новость, один раз на модуль."""
+    with module_db.unblock():
+        return News.objects.create(
+            title='Заголовок_новости',
+            text='Текст_новости',
+        )
+
+
+@pytest.fixture(scope='module', autouse=True)
+def module_data(request):
+    """
+    Общие данные модулей с доступом к базе.
+
+    Создаются заранее: фикстуры, запрошенные через lazy_fixture, иначе
+    создали бы их уже внутри транзакции теста, и они откатились бы после
+    первого же теста.
+    """
+    if request.node.get_closest_marker('django_db') is not None:
+        request.getfixturevalue('module_users')
+        request.getfixturevalue('module_news')
+
+
+def logged_in_client(cookies):
+    """Клиент с готовой сессией вместо force_login в каждом тесте."""
+    client = Client()
+    client.cookies = deepcopy(cookies)
+    return client
+
 
 @pytest.fixture
-def author(django_user_model):
+def author(module_users):
     """Фикстура для создания автора."""
-    return django_user_model.objects.create(username='Автор')
+    return deepcopy(module_users['author'][0])
 
 
 @pytest.fixture
-def user(django_user_model):
+def user(module_users):
     """Фикстура для создания пользователя."""
-    return django_user_model.objects.create(username='Юзер')
+    return deepcopy(module_users['user'][0])
 
 
 @pytest.fixture
-def author_client(author):
+def author_client(module_users):
     """Фикстура для создания клиента с автором."""
-    client = Client()
-    client.force_login(author)
-    return client
+    return logged_in_client(module_users['author'][1])
 
 
 @pytest.fixture
-def user_client(user):
+def user_client(module_users):
     """Фикстура для создания клиента с пользователя не автор."""
-    client = Client()
-    client.force_login(user)
-    return client
+    return logged_in_client(module_users['user'][1])
 
 
 @pytest.fixture
-def news():
+def news(module_news):
     """Фикстура для создания новости."""
-    news = News.objects.create(
-        title='Заголовок_новости',
-        text='Текст_новости',
-    )
-    return news
+    return deepcopy(module_news)
 
 
 @pytest.fixture
@@ -84,6 +155,38 @@ def comments_for_same_news(author, news):
         )
 
 
+@pytest.fixture
+def comments_for_pagination(author, news):
+    """
+    Фикстура для создания комментариев с совпадающим временем создания.
+
+    Возвращает число созданных комментариев.
+    """
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(COMMENTS_FOR_PAGINATION)
+    )
+    Comment.objects.filter(news=news).update(created=timezone.now())
+    return COMMENTS_FOR_PAGINATION
+
+
+@pytest.fixture
+def many_comments_for_main_page(author, news_for_main_page):
+    """
+    Фикстура для создания множества комментариев к новостям главной.
+
+    Возвращает число комментариев у каждой новости.
+    """
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for news in News.objects.all()
+        for index in range(COMMENTS_PER_NEWS)
+    )
+    # bulk_create не отправляет сигналов, счётчики заполняются вручную.
+    News.objects.update(comments_count=COMMENTS_PER_NEWS)
+    return COMMENTS_PER_NEWS
+
+
 @pytest.fixture
 def form_data():
     """Фикстура для создания формы комментария."""
@@ -104,6 +207,53 @@ def url_news_detail(news):
     return reverse('news:detail', args=(news.id,))
 
 
+@pytest.fixture
+def url_news_home_async():
+    """Фикстура асинхронного варианта главной страницы."""
+    return reverse('news:home_async')
+
+
+@pytest.fixture
+def url_news_detail_async(news):
+    """Фикстура асинхронного варианта страницы новости."""
+    return reverse('news:detail_async', args=(news.id,))
+
+
+@pytest.fixture
+def url_news_archive_year(news):
+    """Фикстура архива новостей за год новости."""
+    return reverse('news:archive_year', args=(news.date.year,))
+
+
+@pytest.fixture
+def url_news_archive_month(news):
+    """Фикстура архива новостей за месяц новости."""
+    return reverse(
+        'news:archive_month', args=(news.date.year, news.date.month)
+    )
+
+
+@pytest.fixture
+def url_news_archive_day(news):
+    """Фикстура архива новостей за день новости."""
+    return reverse(
+        'news:archive_day',
+        args=(news.date.year, news.date.month, news.date.day)
+    )
+
+
+@pytest.fixture
+def url_news_search():
+    """Фикстура поиска по новостям."""
+    return reverse('news:search') + '?q=новости'
+
+
+@pytest.fixture
+def url_news_comments(news):
+    """Фикстура страницы с продолжением комментариев к новости."""
+    return reverse('news:comments', args=(news.id,))
+
+
 @pytest.fixture
 def url_users_signup():
     """Фикстура страницы регистрации."""
@@ -132,3 +282,9 @@ def url_comment_delete(comment):
 def url_comment_edit(comment):
     """Фикстура страницы редактирования комментария."""
     return reverse('news:edit', args=(comment.id,))
+
+
+@pytest.fixture
+def assert_query_budget():
+    """Фикстура для проверки бюджета SQL-запросов блока кода."""
+    return query_budget.assert_query_budget
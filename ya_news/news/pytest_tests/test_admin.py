@@ -0,0 +1,213 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news.admin import COMMENTS_COUNT_IN_NEWS_FORM
+from news.models import Comment, News
+from news.pytest_tests.test_queries import ONLY_SQLITE, explain
+
+pytestmark = pytest.mark.django_db
+
+COMMENTS_COUNT = COMMENTS_COUNT_IN_NEWS_FORM + 5
+USERS_COUNT = 2000
+
+
+@pytest.fixture
+def url_comment_changelist():
+    return reverse('admin:news_comment_changelist')
+
+
+@pytest.fixture
+def many_comments(author, news):
+    """Фикстура для создания комментариев сверх формы новости."""
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(COMMENTS_COUNT)
+    )
+    News.objects.filter(pk=news.pk).update(comments_count=COMMENTS_COUNT)
+    return Comment.objects.filter(news=news)
+
+
+def run_action(admin_client, url, action, comments):
+    """Отправляет действие над комментариями и возвращает число запросов."""
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.post(url, {
+            'action': action,
+            '_selected_action': [comment.pk for comment in comments],
+        })
+    assert response.status_code == HTTPStatus.FOUND
+    return len(context.captured_queries)
+
+
+def test_changelist_queries_do_not_depend_on_comments(
+        admin_client, author, news, many_comments, url_comment_changelist
+):
+    """Новость и автор загружаются в списке тем же запросом."""
+    admin_client.get(url_comment_changelist)
+    with CaptureQueriesContext(connection) as context:
+        admin_client.get(url_comment_changelist)
+    many_comments.exclude(pk=many_comments.first().pk).delete()
+    with CaptureQueriesContext(connection) as single_context:
+        admin_client.get(url_comment_changelist)
+    assert len(context) == len(single_context)
+
+
+@ONLY_SQLITE
+@pytest.mark.parametrize(
+    'params',
+    (
+        {}, {'is_approved__exact': 0},
+        {'created__gte': '2020-01-01 00:00:00+00:00'},
+        {'news__id__exact': 1},
+    ),
+)
+def test_changelist_filters_use_indexes(
+        admin_client, many_comments, url_comment_changelist, params
+):
+    """Страница списка с фильтрами читается по индексу без сортировки."""
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get(url_comment_changelist, params)
+    assert response.status_code == HTTPStatus.OK
+    sql, = (
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT "news_comment"."id"')
+    )
+    plan = explain(sql)
+    assert any('news_comment USING' in step and 'INDEX' in step
+               for step in plan), plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
+
+
+@pytest.mark.parametrize('action', ('approve_comments', 'delete_comments'))
+def test_actions_run_fixed_number_of_queries(
+        admin_client, many_comments, url_comment_changelist, action
+):
+    """
+    Действие над всеми комментариями стоит столько же, сколько над одним.
+
+    Это касается и записей истории об удалении.
+    """
+    many_comments.update(is_approved=False)
+    comments = list(many_comments)
+    # История ссылается на тип содержимого, кеш типов заполняется заранее.
+    ContentType.objects.get_for_model(Comment)
+    single = run_action(
+        admin_client, url_comment_changelist, action, comments[:1]
+    )
+    assert run_action(
+        admin_client, url_comment_changelist, action, comments[1:]
+    ) == single
+
+
+def test_delete_action_logs_deletions(
+        admin_client, many_comments, url_comment_changelist
+):
+    """Удалённые действием комментарии видны в истории админки."""
+    comments = list(many_comments[:3])
+    run_action(
+        admin_client, url_comment_changelist, 'delete_comments', comments
+    )
+    assert set(LogEntry.objects.filter(action_flag=DELETION).values_list(
+        'object_id', 'object_repr'
+    )) == {(str(comment.pk), str(comment)) for comment in comments}
+
+
+def test_actions_keep_comments_count(
+        admin_client, client, news, many_comments, url_comment_changelist,
+        url_news_detail
+):
+    """Скрытые комментарии пропадают со страницы и из счётчика новости."""
+    hidden = list(many_comments[:5])
+    run_action(
+        admin_client, url_comment_changelist, 'disapprove_comments', hidden
+    )
+    news.refresh_from_db()
+    assert news.comments_count == COMMENTS_COUNT - 5
+    response = client.get(url_news_detail)
+    assert not set(response.context['comments']) & set(hidden)
+    run_action(
+        admin_client, url_comment_changelist, 'approve_comments', hidden[:2]
+    )
+    run_action(
+        admin_client, url_comment_changelist, 'delete_comments', hidden[2:]
+    )
+    news.refresh_from_db()
+    assert news.comments_count == COMMENTS_COUNT - 3
+    assert many_comments.count() == COMMENTS_COUNT - 3
+
+
+def test_news_form_shows_latest_comments(admin_client, news, many_comments):
+    """В форме новости редактируются только последние комментарии."""
+    response = admin_client.get(
+        reverse('admin:news_news_change', args=(news.pk,))
+    )
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == COMMENTS_COUNT_IN_NEWS_FORM
+    assert formset.forms[0].instance == many_comments.order_by(
+        '-created', '-pk'
+    ).first()
+
+
+def test_news_form_does_not_depend_on_users(
+        admin_client, news, many_comments
+):
+    """Автор комментария выбирается автодополнением, а не списком всех."""
+    url = reverse('admin:news_news_change', args=(news.pk,))
+    # Первый запрос ещё заполняет кеш типов содержимого.
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get(url)
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'пользователь{index}') for index in range(USERS_COUNT)
+    )
+    with CaptureQueriesContext(connection) as many_users_context:
+        many_users_response = admin_client.get(url)
+    assert len(many_users_context) == len(context)
+    assert len(many_users_response.content) == len(response.content)
+
+
+def test_user_autocomplete_uses_username_index(admin_client, author):
+    """Автодополнение ищет начало имени диапазоном по индексу."""
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'пользователь{index}') for index in range(30)
+    )
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get(reverse('admin:autocomplete'), {
+            'term': 'пользователь2', 'app_label': 'news',
+            'model_name': 'comment', 'field_name': 'author',
+        })
+    assert response.status_code == HTTPStatus.OK
+    assert [result['text'] for result in response.json()['results']] == [
+        'пользователь2', *(f'пользователь2{index}' for index in range(10))
+    ]
+    if connection.vendor == 'sqlite':
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if '"auth_user"."username" >=' in query['sql']
+        ]
+        # Подсчёт для пагинации и сама страница результатов.
+        assert len(queries) == 2
+        for sql in queries:
+            plan = explain(sql)
+            assert any('(username>? AND username<?)' in step
+                       for step in plan), plan
+
+
+def test_user_changelist_keeps_stock_search(admin_client):
+    """В списке пользователей поиск ищет и по email, и по части имени."""
+    User = get_user_model()
+    user = User.objects.create(
+        username='читатель', email='reader@example.com'
+    )
+    url = reverse('admin:auth_user_changelist')
+    for query in ('reader@example', 'тател'):
+        response = admin_client.get(url, {'q': query})
+        assert list(response.context['cl'].result_list) == [user], query
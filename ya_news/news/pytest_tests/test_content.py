@@ -1,7 +1,17 @@
+from datetime import date
+from http import HTTPStatus
+
 import pytest
 from django.conf import settings
+from django.db.models.signals import post_init
+from django.test.client import Client
+from django.urls import reverse
 
 from news.forms import CommentForm
+from news.models import Comment, News
+
+COMMENTS_PAGE_SIZE = 2
+NEWS_PAGE_SIZE = 2
 
 
 pytestmark = pytest.mark.django_db
@@ -26,6 +36,62 @@ def test_sort_news_for_main_page(news_for_main_page, client, url_news_home):
     assert all_dates == sorted_dates
 
 
+def test_comments_count_on_main_page(
+        many_comments_for_main_page, client, url_news_home
+):
+    """Количество комментариев берётся из счётчика новости."""
+    response = client.get(url_news_home)
+    object_list = response.context['object_list']
+    assert all(
+        object_news.comments_count == many_comments_for_main_page
+        for object_news in object_list
+    )
+    assert (
+        f'Комментариев: {many_comments_for_main_page}'
+        in response.content.decode()
+    )
+
+
+def test_main_page_does_not_load_comments(
+        many_comments_for_main_page, client, url_news_home,
+        django_assert_num_queries
+):
+    """Главная страница строится одним запросом без загрузки комментариев."""
+    loaded_comments = []
+
+    def count_comment(sender, instance, **kwargs):
+        loaded_comments.append(instance)
+
+    post_init.connect(count_comment, sender=Comment)
+    try:
+        with django_assert_num_queries(1):
+            client.get(url_news_home)
+    finally:
+        post_init.disconnect(count_comment, sender=Comment)
+    assert not loaded_comments
+
+
+def test_main_page_is_cached(
+        news_for_main_page, client, url_news_home, django_assert_num_queries
+):
+    """Повторный запрос главной страницы не обращается к базе данных."""
+    first_response = client.get(url_news_home)
+    with django_assert_num_queries(0):
+        response = client.get(url_news_home)
+    assert response.content == first_response.content
+
+
+def test_main_page_cache_invalidated_on_write(
+        author, news, client, url_news_home
+):
+    """Новые комментарии и новости сбрасывают кеш главной страницы."""
+    client.get(url_news_home)
+    Comment.objects.create(news=news, author=author, text='Комментарий')
+    assert 'Комментариев: 1' in client.get(url_news_home).content.decode()
+    news.delete()
+    assert news.title not in client.get(url_news_home).content.decode()
+
+
 def test_comment_order(
         client, author, news, comments_for_same_news, url_news_detail
 ):
@@ -39,6 +105,251 @@ def test_comment_order(
     assert all_dates == sorted_dates
 
 
+def test_comments_first_page_is_limited(
+        settings, client, comments_for_pagination, url_news_detail
+):
+    """На странице новости выводится только первая страница комментариев."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = COMMENTS_PAGE_SIZE
+    response = client.get(url_news_detail)
+    assert len(response.context['comments']) == COMMENTS_PAGE_SIZE
+    assert response.context['next_cursor'] is not None
+
+
+def test_load_more_returns_all_comments_once(
+        settings, client, news, comments_for_pagination, url_news_detail,
+        url_news_comments, django_assert_max_num_queries
+):
+    """Курсоры проходят все комментарии по порядку и без повторов."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = COMMENTS_PAGE_SIZE
+    response = client.get(url_news_detail)
+    shown = list(response.context['comments'])
+    cursor = response.context['next_cursor']
+    while cursor:
+        with django_assert_max_num_queries(1):
+            response = client.get(url_news_comments, {'cursor': cursor})
+        assert len(response.context['comments']) <= COMMENTS_PAGE_SIZE
+        shown.extend(response.context['comments'])
+        cursor = response.context['next_cursor']
+    expected = list(
+        Comment.objects.filter(news=news).order_by('created', 'pk')
+    )
+    assert shown == expected
+    assert len(shown) == comments_for_pagination
+
+
+def test_news_detail_not_modified(
+        client, comment, url_news_detail, django_assert_num_queries
+):
+    """Неизменившаяся страница новости отдаётся ответом 304."""
+    response = client.get(url_news_detail)
+    assert response.has_header('ETag')
+    assert not response.has_header('Last-Modified')
+    with django_assert_num_queries(1):
+        response = client.get(
+            url_news_detail, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_news_detail_modified_by_comments(
+        client, author, news, comment, url_news_detail
+):
+    """Новые и отредактированные комментарии меняют ETag страницы."""
+    etag = client.get(url_news_detail)['ETag']
+    comment.text = 'Новый текст'
+    comment.save()
+    response = client.get(url_news_detail, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    etag = response['ETag']
+    Comment.objects.create(news=news, author=author, text='Комментарий')
+    response = client.get(url_news_detail, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_news_detail_ignores_if_modified_since(
+        client, news, url_news_detail
+):
+    """Правка текста не меняет дат, поэтому If-Modified-Since не даёт 304."""
+    news.text = 'Новый текст'
+    news.save()
+    response = client.get(
+        url_news_detail, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_news_detail_etag_depends_on_user(
+        client, author_client, comment, url_news_detail
+):
+    """Разметка для автора отличается, поэтому отличается и ETag."""
+    etag = client.get(url_news_detail)['ETag']
+    response = author_client.get(url_news_detail, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    'url', (
+        pytest.lazy_fixture('url_news_detail'),
+        pytest.lazy_fixture('url_news_detail_async'),
+    )
+)
+def test_news_detail_etag_changes_after_relogin(author, url):
+    """После нового входа страница с прежним токеном CSRF не отдаётся."""
+    client = Client()
+    client.force_login(author)
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    )
+    client.logout()
+    client.force_login(author)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_async_main_page_matches_sync(
+        news_for_main_page, client, url_news_home, url_news_home_async
+):
+    """Асинхронная главная выводит те же новости и делит с синхронной кеш."""
+    response = client.get(url_news_home_async)
+    expected = client.get(url_news_home)
+    assert list(response.context['object_list']) == list(
+        expected.context['object_list']
+    )
+    assert response.content == expected.content
+
+
+def test_async_news_detail(
+        client, comment, url_news_detail, url_news_detail_async
+):
+    """Асинхронная страница новости совпадает с синхронной, включая 304."""
+    expected = client.get(url_news_detail)
+    response = client.get(url_news_detail_async)
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected.content
+    assert response['ETag'] == expected['ETag']
+    assert not response.has_header('Last-Modified')
+    response = client.get(
+        url_news_detail_async, HTTP_IF_NONE_MATCH=expected['ETag']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.fixture
+def archive_news():
+    """Новости нескольких лет, в том числе с одинаковой датой."""
+    News.objects.bulk_create(
+        News(title=f'Архив {index}', text='Старый текст',
+             date=date(2020 + index % 2, 5, 1 + index % 3))
+        for index in range(12)
+    )
+
+
+@pytest.mark.parametrize(
+    'url_name, args, expected',
+    (
+        ('news:archive_year', (2020,), 6),
+        ('news:archive_month', (2021, 5), 6),
+        ('news:archive_day', (2020, 5, 1), 2),
+        ('news:archive_month', (2020, 6), 0),
+    )
+)
+def test_archive_pages_show_period_news_once(
+        settings, client, archive_news, url_name, args, expected
+):
+    """Курсоры архива проходят новости периода по порядку и без повторов."""
+    settings.NEWS_COUNT_ON_ARCHIVE_PAGE = NEWS_PAGE_SIZE
+    url = reverse(url_name, args=args)
+    response = client.get(url)
+    shown = list(response.context['news_list'])
+    cursor = response.context['next_cursor']
+    while cursor:
+        response = client.get(url, {'cursor': cursor})
+        assert len(response.context['news_list']) <= NEWS_PAGE_SIZE
+        shown.extend(response.context['news_list'])
+        cursor = response.context['next_cursor']
+    assert len(shown) == expected
+    assert shown == sorted(shown, key=lambda news: (-news.date.toordinal(),
+                                                    news.pk))
+
+
+@pytest.mark.parametrize(
+    'url, expected_status',
+    (
+        ('/archive/2020/13/', HTTPStatus.NOT_FOUND),
+        ('/archive/2021/2/29/', HTTPStatus.NOT_FOUND),
+        ('/archive/2020/?cursor=x', HTTPStatus.BAD_REQUEST),
+        ('/search/?q=текст&cursor=x', HTTPStatus.BAD_REQUEST),
+        (f'/archive/2020/?cursor=2020-05-01_{"9" * 25}',
+         HTTPStatus.BAD_REQUEST),
+        (f'/search/?q=текст&cursor=2020-05-01_{"9" * 25}',
+         HTTPStatus.BAD_REQUEST),
+    )
+)
+def test_archive_and_search_bad_input(client, url, expected_status):
+    """Несуществующая дата даёт 404, некорректный курсор — 400."""
+    assert client.get(url).status_code == expected_status
+
+
+def test_archive_cached_per_period(
+        client, archive_news, django_assert_num_queries
+):
+    """Изменение новости сбрасывает кеш только архивов её периодов."""
+    url_2020 = reverse('news:archive_year', args=(2020,))
+    url_2021 = reverse('news:archive_year', args=(2021,))
+    client.get(url_2020)
+    client.get(url_2021)
+    with django_assert_num_queries(0):
+        client.get(url_2020)
+    moved = News.objects.filter(date__year=2021).first()
+    moved.date = date(2022, 1, 1)
+    moved.save()
+    assert len(client.get(url_2021).context['news_list']) == 5
+    with django_assert_num_queries(0):
+        client.get(url_2020)
+    News.objects.create(title='Новая', text='Текст', date=date(2020, 5, 1))
+    assert len(client.get(url_2020).context['news_list']) == 7
+
+
+def test_archive_cache_key_uses_normalized_cursor(
+        settings, client, archive_news, django_assert_num_queries
+):
+    """Разные записи одного курсора читают одну страницу из кеша."""
+    settings.NEWS_COUNT_ON_ARCHIVE_PAGE = NEWS_PAGE_SIZE
+    url = reverse('news:archive_year', args=(2020,))
+    cursor = client.get(url).context['next_cursor']
+    news_date, pk = cursor.split('_')
+    response = client.get(url, {'cursor': cursor})
+    for same_cursor in (f'{news_date}_0{pk}', f'{news_date}_+{pk}'):
+        with django_assert_num_queries(0):
+            same_response = client.get(url, {'cursor': same_cursor})
+        assert same_response.content == response.content
+
+
+def test_search_finds_news_by_title_and_text(client, archive_news):
+    """Поиск ищет все слова в заголовке и тексте, последнее — по началу."""
+    url = reverse('news:search')
+    for query, expected in (
+        ('архив 3', 1), ('Старый тек', 12), ('архив новый', 0), ('', 0),
+        ('"', 0), ('текст OR', 0), ('NEAR(', 0),
+    ):
+        response = client.get(url, {'q': query})
+        assert len(response.context['news_list']) == min(
+            expected, settings.NEWS_COUNT_ON_ARCHIVE_PAGE
+        ), query
+
+
+def test_search_follows_changes(client, news):
+    """Индекс поиска обновляется при правке и удалении новости."""
+    url = reverse('news:search')
+    news.title = 'Переименованная'
+    news.save()
+    assert client.get(url, {'q': 'переименованная'}).context['news_list']
+    news.delete()
+    assert not client.get(url, {'q': 'переименованная'}).context['news_list']
+
+
 @pytest.mark.parametrize(
     'parametrized_client, expected_status, form',
     (
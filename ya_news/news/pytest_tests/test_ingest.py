@@ -0,0 +1,133 @@
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from news.models import Comment, News
+from news.services import ingest_news
+
+pytestmark = pytest.mark.django_db
+
+FEED_DATE = '2024-01-01'
+
+
+@pytest.fixture
+def feed_news():
+    """Новости с датой ленты, без общей новости модуля."""
+    return News.objects.filter(date=date.fromisoformat(FEED_DATE))
+
+
+@pytest.fixture
+def feed(author):
+    """Фикстура ленты новостей с дубликатами и комментариями."""
+    return [
+        {
+            'title': f'Новость {index % 3}',
+            'text': 'Текст новости',
+            'date': FEED_DATE,
+            'comments': [
+                {'author': author.username, 'text': 'Комментарий'},
+                {'author': 'неизвестный', 'text': 'Комментарий'},
+            ],
+        }
+        for index in range(6)
+    ]
+
+
+def test_ingest_deduplicates_news(feed, feed_news):
+    """Повторы по заголовку и дате отбрасываются в ленте и в базе."""
+    News.objects.create(
+        title='Новость 0', text='Текст', date=date.fromisoformat(FEED_DATE)
+    )
+    stats = ingest_news(feed, chunk_size=2)
+    assert stats.news == 2
+    assert stats.duplicates == 4
+    assert feed_news.count() == 3
+
+
+def test_ingest_attaches_comments(feed, feed_news, author):
+    """Комментарии привязываются к новостям, кроме неизвестных авторов."""
+    stats = ingest_news(feed)
+    assert stats.comments == 3
+    for news in feed_news:
+        assert list(
+            news.comment_set.values_list('author', flat=True)
+        ) == [author.pk]
+
+
+def test_ingest_queries_do_not_depend_on_chunk_size(
+        author, django_assert_num_queries
+):
+    """Пачка записывается фиксированным числом запросов."""
+    feed = [
+        {'title': f'Новость {index}', 'text': 'Текст', 'date': FEED_DATE,
+         'comments': [{'author': author.username, 'text': 'Комментарий'}]}
+        for index in range(50)
+    ]
+    # Дубликаты, вставка новостей, их id, авторы, вставка комментариев и
+    # точка сохранения транзакции пачки.
+    with django_assert_num_queries(7):
+        ingest_news(feed, chunk_size=len(feed))
+    assert Comment.objects.count() == len(feed)
+
+
+def test_ingest_invalidates_cached_archive(client, feed, feed_news):
+    """Загрузка сбрасывает уже закешированные страницы архива её дат."""
+    news_date = date.fromisoformat(FEED_DATE)
+    urls = (
+        reverse('news:archive_year', args=(news_date.year,)),
+        reverse('news:archive_month', args=(news_date.year, news_date.month)),
+        reverse('news:archive_day', args=(
+            news_date.year, news_date.month, news_date.day
+        )),
+    )
+    for url in urls:
+        assert not client.get(url).context['news_list']
+    ingest_news(feed)
+    for url in urls:
+        assert client.get(url).context['news_list'] == list(feed_news)
+
+
+def test_ingest_command(feed, feed_news, tmp_path):
+    """Команда загружает ленту из файла и сообщает скорость загрузки."""
+    path = tmp_path / 'feed.jsonl'
+    path.write_text(
+        ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in feed),
+        encoding='utf-8'
+    )
+    stdout = StringIO()
+    call_command('ingest_news', str(path), stdout=stdout)
+    assert feed_news.count() == 3
+    assert 'строк/с' in stdout.getvalue()
+
+
+@pytest.mark.parametrize(
+    'line, message',
+    (
+        ('{"title": "Новость"', 'Строка 2: некорректный JSON'),
+        ('[]', 'Строка 2: ожидается объект'),
+        ('{"title": "Новость"}', 'Строка 2: поле text'),
+        ('{"title": "Новость", "text": "Текст", "date": "2024-13-01"}',
+         'Строка 2: дата'),
+        ('{"title": "Новость", "text": "Текст", "comments": [{"text": "к"}]}',
+         'Строка 2: comments'),
+        (json.dumps({'title': 'Н' * 51, 'text': 'Текст'}),
+         'Строка 2: заголовок'),
+    ),
+)
+def test_ingest_command_reports_bad_record(
+        feed, feed_news, tmp_path, line, message
+):
+    """Некорректная запись останавливает загрузку с номером её строки."""
+    path = tmp_path / 'feed.jsonl'
+    path.write_text(
+        json.dumps(feed[0], ensure_ascii=False) + '\n' + line + '\n',
+        encoding='utf-8'
+    )
+    with pytest.raises(CommandError, match=message):
+        call_command('ingest_news', str(path), stdout=StringIO())
+    assert not feed_news.exists()
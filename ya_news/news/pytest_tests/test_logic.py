@@ -1,14 +1,26 @@
+import os
 import random
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
 from pytest_django.asserts import assertFormError, assertRedirects
+from pytest_lazyfixture import lazy_fixture as lf
 
+from news.bad_words import get_bad_words_pattern
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
 
 pytestmark = pytest.mark.django_db
 
+# Сессия, пользователь, загрузка объекта и сама запись.
+WRITE_QUERIES = 4
+# Создание и удаление ещё меняют счётчик комментариев новости в одной
+# транзакции с записью: обновление счётчика и точка сохранения.
+COUNTED_WRITE_QUERIES = WRITE_QUERIES + 3
+DELETED_NEWS_COMMENTS = 10
+
 
 def test_user_can_create_comment(
         user_client, news, form_data, url_news_detail, user, author
@@ -24,6 +36,16 @@ def test_user_can_create_comment(
     assert new_comment.news == news
 
 
+def test_user_can_create_comment_on_async_page(
+        user_client, news, form_data, url_news_detail, url_news_detail_async
+):
+    """Асинхронная страница новости принимает комментарии."""
+    count_comments = Comment.objects.count()
+    response = user_client.post(url_news_detail_async, data=form_data)
+    assertRedirects(response, f'{url_news_detail}#comments')
+    assert Comment.objects.count() == count_comments + 1
+
+
 def test_client_can_not_create_comment(
         client, news, form_data, url_news_detail, url_users_login
 ):
@@ -43,6 +65,50 @@ def test_create_comment_with_bad_words(user_client, news, url_news_detail):
     assertFormError(response, form='form', field='text', errors=WARNING)
 
 
+@pytest.mark.parametrize(
+    'text, expected',
+    (
+        ('Вы РЕДИСКА!', True),
+        ('негодяйка', True),
+        ('Обычный комментарий', False),
+    )
+)
+def test_bad_words_pattern(text, expected):
+    """Запрещённые слова ищутся без учёта регистра и внутри слов."""
+    pattern = get_bad_words_pattern(BAD_WORDS)
+    assert bool(pattern.search(text.lower())) == expected
+
+
+def test_bad_words_from_file(
+        settings, tmp_path, user_client, news, url_news_detail
+):
+    """Список запрещённых слов можно загрузить из файла."""
+    bad_words_file = tmp_path / 'bad_words.txt'
+    bad_words_file.write_text('# Список слов\nбука\nзлюка\n', 'utf-8')
+    settings.BAD_WORDS_FILE = str(bad_words_file)
+    count_comments = Comment.objects.count()
+    response = user_client.post(url_news_detail, data={'text': 'Злюка!'})
+    assert Comment.objects.count() == count_comments
+    assertFormError(response, form='form', field='text', errors=WARNING)
+
+
+def test_bad_words_pattern_compiled_once(settings, tmp_path):
+    """Выражение компилируется один раз и заново после правки файла."""
+    assert get_bad_words_pattern(BAD_WORDS) is get_bad_words_pattern(
+        BAD_WORDS
+    )
+    bad_words_file = tmp_path / 'bad_words.txt'
+    bad_words_file.write_text('  # Отступ перед комментарием\nбука\n', 'utf-8')
+    settings.BAD_WORDS_FILE = str(bad_words_file)
+    pattern = get_bad_words_pattern(BAD_WORDS)
+    assert get_bad_words_pattern(BAD_WORDS) is pattern
+    assert not pattern.search('# отступ перед комментарием')
+    bad_words_file.write_text('злюка\n', 'utf-8')
+    os.utime(bad_words_file, ns=(0, 0))
+    pattern = get_bad_words_pattern(BAD_WORDS)
+    assert pattern.search('злюка') and not pattern.search('бука')
+
+
 def test_author_can_edit_comment(author_client, comment, form_data,
                                  url_comment_edit, url_news_detail,
                                  author, news):
@@ -89,3 +155,100 @@ def test_not_author_can_not_delete_comment(
     response = user_client.post(url_comment_delete)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Comment.objects.count() == count_comments
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, url, expected_queries',
+    (
+        (lf('user_client'), lf('url_news_detail'), COUNTED_WRITE_QUERIES),
+        (lf('author_client'), lf('url_comment_edit'), WRITE_QUERIES),
+        (lf('author_client'), lf('url_comment_delete'), COUNTED_WRITE_QUERIES),
+    )
+)
+def test_comment_writes_query_count(
+        parametrized_client, url, expected_queries, form_data,
+        django_assert_num_queries
+):
+    """Запись комментария не загружает объекты повторно."""
+    with django_assert_num_queries(expected_queries):
+        response = parametrized_client.post(url, data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_comments_count_follows_writes(
+        user_client, author_client, news, comment, form_data,
+        url_news_detail, url_comment_delete
+):
+    """Счётчик комментариев новости меняется при создании и удалении."""
+    news.refresh_from_db()
+    assert news.comments_count == 1
+    user_client.post(url_news_detail, data=form_data)
+    news.refresh_from_db()
+    assert news.comments_count == 2
+    author_client.post(url_comment_delete)
+    news.refresh_from_db()
+    assert news.comments_count == 1
+
+
+def test_comments_count_follows_moved_comment(news, comment):
+    """Перенос комментария к другой новости меняет оба счётчика."""
+    other_news = News.objects.create(title='Другая', text='Текст')
+    comment = Comment.objects.get(pk=comment.pk)
+    comment.news = other_news
+    comment.save()
+    news.refresh_from_db()
+    other_news.refresh_from_db()
+    assert (news.comments_count, other_news.comments_count) == (0, 1)
+
+
+def test_comments_count_follows_approval(news, comment):
+    """Скрытый комментарий не учитывается в счётчике новости."""
+    comment = Comment.objects.get(pk=comment.pk)
+    comment.is_approved = False
+    comment.save()
+    news.refresh_from_db()
+    assert news.comments_count == 0
+    comment.delete()
+    news.refresh_from_db()
+    assert news.comments_count == 0
+
+
+def test_comments_count_never_negative(news, comment):
+    """Разошедшийся счётчик при удалении не уходит ниже нуля."""
+    News.objects.update(comments_count=0)
+    Comment.objects.get(pk=comment.pk).delete()
+    news.refresh_from_db()
+    assert news.comments_count == 0
+
+
+@pytest.mark.parametrize(
+    'delete, loaded_objects',
+    (
+        (lambda news: news.delete(), 1),
+        (lambda news: News.objects.filter(pk=news.pk).delete(), 2),
+    ),
+    ids=('instance', 'queryset'),
+)
+def test_news_delete_skips_comment_counters(
+        author, delete, loaded_objects, django_assert_num_queries
+):
+    """Комментарии удаляемой новости не обновляют её счётчик по одному."""
+    news = News.objects.create(title='Новость', text='Текст')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(DELETED_NEWS_COMMENTS)
+    )
+    # Загрузка комментариев (и новостей), удаление их и самой новости.
+    with django_assert_num_queries(loaded_objects + 2):
+        delete(news)
+    assert not Comment.objects.filter(news_id=news.pk).exists()
+
+
+def test_recount_comments(news, comment):
+    """Команда пересчёта исправляет разошедшиеся счётчики."""
+    News.objects.update(comments_count=100)
+    stdout = StringIO()
+    call_command('recount_comments', batch_size=1, stdout=stdout)
+    news.refresh_from_db()
+    assert news.comments_count == 1
+    assert 'Исправлено счётчиков: 1' in stdout.getvalue()
@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pytest_lazyfixture import lazy_fixture as lf
+
+from common.query_budget import QueryBudget
+from news import urls
+from news.models import News
+
+pytestmark = pytest.mark.django_db
+
+ONLY_SQLITE = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='План запроса проверяется через EXPLAIN QUERY PLAN SQLite.'
+)
+
+QUERY_BUDGETS = {
+    'news:home': QueryBudget(max_queries=3, max_time=0.05),
+    'news:detail': QueryBudget(max_queries=5, max_time=0.05),
+    'news:comments': QueryBudget(max_queries=3, max_time=0.05),
+    'news:edit': QueryBudget(max_queries=4, max_time=0.05),
+    'news:delete': QueryBudget(max_queries=4, max_time=0.05),
+    'news:home_async': QueryBudget(max_queries=3, max_time=0.05),
+    'news:detail_async': QueryBudget(max_queries=5, max_time=0.05),
+    'news:archive_year': QueryBudget(max_queries=3, max_time=0.05),
+    'news:archive_month': QueryBudget(max_queries=3, max_time=0.05),
+    'news:archive_day': QueryBudget(max_queries=3, max_time=0.05),
+    'news:search': QueryBudget(max_queries=3, max_time=0.05),
+}
+ROUTES = (
+    ('news:home', lf('url_news_home')),
+    ('news:detail', lf('url_news_detail')),
+    ('news:comments', lf('url_news_comments')),
+    ('news:edit', lf('url_comment_edit')),
+    ('news:delete', lf('url_comment_delete')),
+    ('news:home_async', lf('url_news_home_async')),
+    ('news:detail_async', lf('url_news_detail_async')),
+    ('news:archive_year', lf('url_news_archive_year')),
+    ('news:archive_month', lf('url_news_archive_month')),
+    ('news:archive_day', lf('url_news_archive_day')),
+    ('news:search', lf('url_news_search')),
+)
+# Точки сохранения вокруг записи учитываются: тест идёт внутри транзакции.
+WRITE_QUERY_BUDGETS = {
+    'news:detail': QueryBudget(max_queries=7, max_time=0.05),
+    'news:detail_async': QueryBudget(max_queries=7, max_time=0.05),
+    'news:edit': QueryBudget(max_queries=4, max_time=0.05),
+    'news:delete': QueryBudget(max_queries=7, max_time=0.05),
+}
+WRITE_ROUTES = (
+    ('news:detail', lf('url_news_detail'), lf('form_data')),
+    ('news:detail_async', lf('url_news_detail_async'), lf('form_data')),
+    ('news:edit', lf('url_comment_edit'), lf('form_data')),
+    ('news:delete', lf('url_comment_delete'), {}),
+)
+
+
+def explain(sql):
+    """Возвращает строки плана запроса SQLite."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@ONLY_SQLITE
+@pytest.mark.parametrize(
+    'url',
+    (
+        lf('url_news_home'), lf('url_news_detail'), lf('url_news_comments'),
+        lf('url_news_archive_year'), lf('url_news_archive_day'),
+    ),
+)
+def test_hot_queries_use_indexes(client, comment, url):
+    """Запросы к новостям и комментариям не сканируют таблицы целиком."""
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if '"news_' in query['sql']
+    ]
+    assert queries
+    for sql in queries:
+        plan = explain(sql)
+        assert any('INDEX' in step or 'PRIMARY KEY' in step
+                   for step in plan), (sql, plan)
+        assert not any(step.startswith('SCAN') and 'INDEX' not in step
+                       for step in plan), (sql, plan)
+        assert not any('TEMP B-TREE' in step for step in plan), (sql, plan)
+
+
+@ONLY_SQLITE
+def test_archive_cursor_narrows_index_range(
+        client, news, url_news_archive_year
+):
+    """Курсор архива становится границей диапазона индекса, а не фильтром."""
+    news_date = News.objects.get(pk=news.pk).date.isoformat()
+    with CaptureQueriesContext(connection) as context:
+        client.get(url_news_archive_year, {'cursor': f'{news_date}_{news.pk}'})
+    sql, = context.captured_queries
+    assert ' OR ' not in sql['sql']
+    assert f'"news_news"."date" <= \'{news_date}\'' in sql['sql']
+    assert explain(sql['sql']) == [
+        'SEARCH news_news USING INDEX news_date_id_idx (date>? AND date<?)'
+    ]
+
+
+@ONLY_SQLITE
+def test_search_uses_fts_index(client, news, url_news_search):
+    """Поиск находит новости по индексу FTS5 и загружает их по ключу."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url_news_search)
+    assert response.context['news_list'] == [news]
+    sql, = context.captured_queries
+    plan = explain(sql['sql'])
+    assert any('VIRTUAL TABLE INDEX' in step for step in plan), plan
+    assert any('USING INTEGER PRIMARY KEY' in step for step in plan), plan
+
+
+def test_every_route_has_query_budget():
+    """Для каждого маршрута приложения объявлен бюджет запросов."""
+    route_names = {
+        f'{urls.app_name}:{pattern.name}' for pattern in urls.urlpatterns
+    }
+    assert route_names == set(QUERY_BUDGETS)
+    assert route_names == {url_name for url_name, _ in ROUTES}
+
+
+@pytest.mark.parametrize('url_name, url', ROUTES)
+def test_route_query_budget(
+        author_client, comment, url_name, url, assert_query_budget
+):
+    """Страницы укладываются в бюджет SQL-запросов."""
+    with assert_query_budget(QUERY_BUDGETS[url_name], label=url_name):
+        author_client.get(url)
+
+
+@pytest.mark.parametrize('url_name, url, data', WRITE_ROUTES)
+def test_write_route_query_budget(
+        author_client, comment, url_name, url, data, assert_query_budget
+):
+    """Создание, правка и удаление комментария укладываются в бюджет."""
+    with assert_query_budget(WRITE_QUERY_BUDGETS[url_name], label=url_name):
+        response = author_client.post(url, data)
+    assert response.status_code == HTTPStatus.FOUND
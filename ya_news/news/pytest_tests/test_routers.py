@@ -0,0 +1,105 @@
+import shutil
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test.client import Client
+from django.urls import reverse
+
+from news.models import Comment, News
+from yanews.routers import PrimaryReplicaRouter
+
+PRIMARY = 'test_primary'
+REPLICA = 'test_replica'
+TEMPLATE = 'test_migrated'
+
+
+class FilePrimaryRouter(PrimaryReplicaRouter):
+    """Маршрутизатор с основной базой в отдельном файле."""
+    primary = PRIMARY
+
+
+def add_database(alias, path):
+    """Подключает файл SQLite под заданным псевдонимом."""
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path),
+    }
+
+
+def remove_database(alias):
+    """Закрывает подключение и убирает псевдоним из настроек."""
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+@pytest.fixture(scope='module')
+def migrated_db(tmp_path_factory, django_db_blocker):
+    """Файл базы с применёнными миграциями, один раз на модуль."""
+    path = tmp_path_factory.mktemp('replicas') / 'migrated'
+    add_database(TEMPLATE, path)
+    with django_db_blocker.unblock():
+        call_command('migrate', database=TEMPLATE, verbosity=0)
+    remove_database(TEMPLATE)
+    return path
+
+
+@pytest.fixture
+def replicated_db(migrated_db, tmp_path, settings, django_db_blocker):
+    """
+    Основная база и реплика в отдельных файлах SQLite.
+
+    Обе — копии мигрированного файла, функция replicate имитирует
+    догоняющую репликацию.
+    """
+    primary_path, replica_path = tmp_path / 'primary', tmp_path / 'replica'
+    shutil.copyfile(migrated_db, primary_path)
+    shutil.copyfile(migrated_db, replica_path)
+    add_database(PRIMARY, primary_path)
+    add_database(REPLICA, replica_path)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    settings.DATABASE_ROUTERS = [
+        'news.pytest_tests.test_routers.FilePrimaryRouter'
+    ]
+
+    def replicate():
+        connections[PRIMARY].close()
+        connections[REPLICA].close()
+        shutil.copyfile(primary_path, replica_path)
+
+    with django_db_blocker.unblock():
+        yield replicate
+    remove_database(PRIMARY)
+    remove_database(REPLICA)
+
+
+def test_reads_go_to_replica(replicated_db):
+    """Чтение идёт в реплику и видит запись после репликации."""
+    News.objects.create(title='Заголовок', text='Текст')
+    assert News.objects.count() == 0
+    assert News.objects.using(PRIMARY).count() == 1
+    replicated_db()
+    assert News.objects.count() == 1
+
+
+def test_replica_is_not_migrated(replicated_db):
+    """Миграции применяются только к основной базе."""
+    assert FilePrimaryRouter().allow_migrate(REPLICA, 'news') is False
+    assert FilePrimaryRouter().allow_migrate(PRIMARY, 'news') is True
+
+
+def test_session_reads_own_comment_after_post(replicated_db):
+    """Автор видит свой комментарий сразу, остальные — после репликации."""
+    user = get_user_model().objects.create(username='Юзер')
+    news = News.objects.create(title='Заголовок', text='Текст')
+    replicated_db()
+    client = Client()
+    client.force_login(user)
+    url = reverse('news:detail', args=(news.pk,))
+    response = client.post(url, data={'text': 'Свой комментарий'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.using(REPLICA).count() == 0
+    assert 'Свой комментарий' in client.get(url).content.decode()
+    assert 'Свой комментарий' not in Client().get(url).content.decode()
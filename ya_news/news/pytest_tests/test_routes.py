@@ -6,6 +6,7 @@ from pytest_lazyfixture import lazy_fixture as lf
 
 URL_NEWS_HOME = lf('url_news_home')
 URL_NEWS_DETAIL = lf('url_news_detail')
+URL_NEWS_COMMENTS = lf('url_news_comments')
 URL_USERS_SIGNUP = lf('url_users_signup')
 URL_USERS_LOGIN = lf('url_users_login')
 URL_USERS_LOGOUT = lf('url_users_logout')
@@ -26,6 +27,7 @@ pytestmark = pytest.mark.django_db
     (
         (URL_NEWS_HOME, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (URL_NEWS_DETAIL, ANONYMOUS_CLIENT, HTTPStatus.OK),
+        (URL_NEWS_COMMENTS, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (URL_USERS_SIGNUP, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (URL_USERS_LOGIN, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (URL_USERS_LOGOUT, ANONYMOUS_CLIENT, HTTPStatus.OK),
@@ -50,3 +52,30 @@ def test_redirect_for_anonymous_user(url, url_users_login, client):
     expected_url = f'{url_users_login}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'bad_cursor',
+        '2020-05-01T00:00:00+00:00_' + '9' * 25,
+        '2020-05-01T00:00:00+00:00_-1',
+    ),
+)
+def test_bad_comments_cursor(client, url_news_comments, cursor):
+    """Некорректный курсор комментариев приводит к ошибке 400."""
+    response = client.get(url_news_comments, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize('method', ('put', 'patch', 'delete', 'options'))
+def test_async_news_detail_allowed_methods(
+        author_client, url_news_detail_async, method
+):
+    """Асинхронная страница новости принимает только GET, HEAD и POST."""
+    response = getattr(author_client, method)(url_news_detail_async)
+    assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+    assert response['Allow'] == 'GET, HEAD, POST'
+    assert author_client.head(url_news_detail_async).status_code == (
+        HTTPStatus.OK
+    )
@@ -0,0 +1,64 @@
+from importlib import import_module
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from news.pytest_tests.test_queries import ONLY_SQLITE
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.parametrize(
+    'backend, session_queries',
+    (('db', 1), ('cached_db', 0), ('signed_cookies', 0)),
+)
+def test_session_backend_queries(
+        settings, author, url_news_detail, backend, session_queries
+):
+    """Из кеша и cookie сессия читается без запросов к базе."""
+    settings.SESSION_ENGINE = settings.SESSION_ENGINES[backend]
+    client = Client()
+    client.force_login(author)
+    client.get(url_news_detail)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url_news_detail)
+    assert response.context['user'] == author
+    assert sum(
+        '"django_session"' in query['sql']
+        for query in context.captured_queries
+    ) == session_queries
+
+
+@ONLY_SQLITE
+def test_production_pragmas_applied_to_new_connection(settings):
+    """Боевой профиль держит подключения и настраивает каждое новое."""
+    production = import_module('yanews.settings_production')
+    assert production.DATABASES['default']['CONN_MAX_AGE'] > 0
+    settings.SQLITE_PRAGMAS = production.SQLITE_PRAGMAS
+    new_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+    try:
+        with new_connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone() == (5000,)
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone() == (1,), 'Ожидается synchronous=NORMAL'
+    finally:
+        new_connection.close()
+
+
+def test_production_cache_is_shared():
+    """Боевой кеш общий для процессов, иначе версии не сбросятся."""
+    production = import_module('yanews.settings_production')
+    assert 'locmem' not in production.CACHES['default']['BACKEND']
+
+
+def test_production_sessions_cache_is_shared():
+    """Выход отзывает сессию во всех процессах, а не только в своём."""
+    production = import_module('yanews.settings_production')
+    sessions = production.CACHES[production.SESSION_CACHE_ALIAS]
+    assert 'locmem' not in sessions['BACKEND']
+    assert sessions['KEY_PREFIX'] != production.CACHES['default'].get(
+        'KEY_PREFIX', ''
+    )
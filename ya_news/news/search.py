@@ -0,0 +1,73 @@
+"""
+Полнотекстовый поиск по новостям.
+
+На SQLite поиск идёт по виртуальной таблице FTS5 news_news_search с
+внешним содержимым: тексты хранятся только в news_news, а индекс
+поддерживают триггеры из миграции 0005. Найденные id подставляются в
+обычный queryset новостей, поэтому результаты листаются той же
+keyset-пагинацией, что и архив.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import News
+
+SEARCH_TABLE = 'news_news_search'
+
+MATCH_SQL = f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+
+
+def is_fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def get_terms(query):
+    """Слова запроса; операторы FTS5 из пользовательского ввода не берутся."""
+    return re.findall(r'\w+', query.lower())
+
+
+def build_match(terms):
+    """
+    Выражение MATCH: все слова в заголовке или тексте новости.
+
+    Каждое слово — отдельная фраза в кавычках, последнее ищется по
+    префиксу.
+    """
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += '*'
+    return ' '.join(phrases)
+
+
+def search_news(query):
+    """
+    Queryset новостей, подходящих под запрос.
+
+    Без FTS5 (не SQLite) выполняется простой поиск по вхождению
+    подстроки. Для запроса без слов возвращается пустой queryset.
+    """
+    terms = get_terms(query)
+    if not terms:
+        return News.objects.none()
+    if not is_fts_available():
+        news = News.objects.all()
+        for term in terms:
+            news = news.filter(Q(title__icontains=term)
+                               | Q(text__icontains=term))
+        return news
+    return News.objects.filter(
+        pk__in=RawSQL(MATCH_SQL, (build_match(terms),))
+    )
+
+
+def rebuild_index():
+    """Перестраивает индекс по таблице новостей и оптимизирует его."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
@@ -0,0 +1,220 @@
+import logging
+import time
+from collections import namedtuple
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import (
+    NEWS_DETAIL_VERSION_KEY, NEWS_LIST_VERSION_KEY, bump_archive_versions,
+    bump_version
+)
+from .models import Comment, News, mute_comment_signals
+
+logger = logging.getLogger(__name__)
+
+IngestStats = namedtuple(
+    'IngestStats', ('news', 'comments', 'duplicates', 'seconds')
+)
+
+
+def ingest_chunk(items):
+    """
+    Записывает пачку новостей с комментариями.
+
+    Дубликаты по паре (заголовок, дата) отбрасываются и внутри пачки, и
+    относительно базы. Новости и комментарии записываются двумя
+    bulk_create, авторы загружаются одним запросом. Возвращает число
+    новостей, комментариев и дубликатов и даты записанных новостей.
+    """
+    unique = {}
+    for item in items:
+        item_date = item.get('date')
+        item_date = date.fromisoformat(item_date) if item_date else (
+            date.today()
+        )
+        unique.setdefault((item['title'], item_date), item)
+    existing = set(News.objects.filter(
+        title__in={title for title, _ in unique}
+    ).values_list('title', 'date'))
+    new_items = {
+        key: item for key, item in unique.items() if key not in existing
+    }
+    authors = get_user_model().objects.in_bulk(
+        {
+            comment['author'] for item in new_items.values()
+            for comment in item.get('comments', ())
+        },
+        field_name='username'
+    )
+    item_comments = {
+        key: [
+            comment for comment in item.get('comments', ())
+            if comment['author'] in authors
+        ]
+        for key, item in new_items.items()
+    }
+    # Комментарии пишутся через bulk_create без сигналов, поэтому
+    # счётчик заполняется сразу.
+    News.objects.bulk_create(
+        News(
+            title=title,
+            text=item['text'],
+            date=item_date,
+            comments_count=len(item_comments[title, item_date]),
+        )
+        for (title, item_date), item in new_items.items()
+    )
+    # SQLite не возвращает id из bulk_create, поэтому они читаются
+    # тем же запросом по индексу (title, date).
+    news_ids = {
+        (title, item_date): pk for pk, title, item_date in
+        News.objects.filter(
+            title__in={title for title, _ in new_items},
+            date__in={item_date for _, item_date in new_items},
+        ).values_list('pk', 'title', 'date')
+    }
+    comments = Comment.objects.bulk_create(
+        Comment(
+            news_id=news_ids[key],
+            author=authors[comment['author']],
+            text=comment['text'],
+        )
+        for key, news_comments in item_comments.items()
+        for comment in news_comments
+    )
+    return (
+        len(new_items), len(comments), len(items) - len(new_items),
+        {item_date for _, item_date in new_items},
+    )
+
+
+def ingest_news(items, chunk_size=500):
+    """
+    Загружает новости из итерируемого источника пачками по chunk_size.
+
+    Источник читается лениво, каждая пачка записывается в своей
+    транзакции. После загрузки сбрасывается кеш главной страницы и
+    архива за периоды загруженных дат, как это делают сигналы
+    сохранения новости: bulk_create сигналов не отправляет.
+    """
+    items = iter(items)
+    news_count = comments_count = duplicates = 0
+    news_dates = set()
+    start = time.monotonic()
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            break
+        with transaction.atomic():
+            created, comments, skipped, dates = ingest_chunk(chunk)
+        news_count += created
+        comments_count += comments
+        duplicates += skipped
+        news_dates.update(dates)
+        elapsed = time.monotonic() - start
+        logger.info(
+            'Загружено новостей: %d, комментариев: %d, дубликатов: %d '
+            '(%.0f строк/с)',
+            news_count, comments_count, duplicates,
+            (news_count + comments_count) / elapsed
+        )
+    bump_version(NEWS_LIST_VERSION_KEY)
+    bump_archive_versions(news_dates)
+    return IngestStats(
+        news_count, comments_count, duplicates, time.monotonic() - start
+    )
+
+
+def recount_comments(batch_size=1000):
+    """
+    Пересчитывает счётчики одобренных комментариев новостей.
+
+    Новости обходятся пачками по первичному ключу, на пачку приходится
+    один запрос подсчёта и одно обновление только расходящихся счётчиков.
+    Возвращает число исправленных новостей.
+    """
+    fixed = 0
+    last_pk = 0
+    while True:
+        stored = dict(
+            News.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', 'comments_count'
+            )[:batch_size]
+        )
+        if not stored:
+            return fixed
+        counts = dict(
+            Comment.objects.filter(
+                news_id__in=stored, is_approved=True
+            ).values(
+                'news'
+            ).annotate(count=Count('pk')).values_list('news', 'count')
+        )
+        wrong = [
+            News(pk=pk, comments_count=counts.get(pk, 0))
+            for pk, comments_count in stored.items()
+            if comments_count != counts.get(pk, 0)
+        ]
+        News.objects.bulk_update(wrong, ('comments_count',))
+        fixed += len(wrong)
+        last_pk = max(stored)
+
+
+def update_comments_count(news_ids):
+    """Одним UPDATE пересчитывает счётчики перечисленных новостей."""
+    approved_count = Comment.objects.filter(
+        news=OuterRef('pk'), is_approved=True
+    ).order_by().values('news').annotate(count=Count('pk')).values('count')
+    News.objects.filter(pk__in=news_ids).update(comments_count=Coalesce(
+        Subquery(approved_count, output_field=IntegerField()), 0
+    ))
+
+
+def invalidate_comments_news(news_ids):
+    """Сбрасывает кеш главной и страниц новостей после массовых правок."""
+    bump_version(NEWS_LIST_VERSION_KEY)
+    for news_id in news_ids:
+        bump_version(NEWS_DETAIL_VERSION_KEY.format(news_id))
+
+
+@transaction.atomic
+def set_comments_approved(comments, is_approved):
+    """
+    Одобряет или скрывает комментарии одним UPDATE.
+
+    Сигналы при этом не отправляются, поэтому счётчики затронутых
+    новостей пересчитываются одним запросом, а не по комментарию.
+    Возвращает число изменённых комментариев.
+    """
+    comments = comments.exclude(is_approved=is_approved)
+    news_ids = list(
+        comments.order_by().values_list('news_id', flat=True).distinct()
+    )
+    changed = comments.update(is_approved=is_approved)
+    update_comments_count(news_ids)
+    invalidate_comments_news(news_ids)
+    return changed
+
+
+@transaction.atomic
+def delete_comments(comments):
+    """
+    Удаляет комментарии пачкой.
+
+    Сигналы отдельных комментариев на время удаления отключены, поэтому
+    счётчики затронутых новостей пересчитываются одним запросом, а не по
+    комментарию. Возвращает число удалённых комментариев.
+    """
+    news_ids = list(
+        comments.order_by().values_list('news_id', flat=True).distinct()
+    )
+    with mute_comment_signals():
+        deleted, _ = comments.delete()
+    update_comments_count(news_ids)
+    invalidate_comments_news(news_ids)
+    return deleted
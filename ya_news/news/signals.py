@@ -0,0 +1,83 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    NEWS_DETAIL_VERSION_KEY, NEWS_LIST_VERSION_KEY, bump_archive_versions,
+    bump_version
+)
+from .models import Comment, News, comment_signals_muted
+
+
+@receiver((post_save, post_delete), sender=News)
+def invalidate_news(sender, instance, **kwargs):
+    """
+    Изменение новости сбрасывает кеш главной, её страницы и архива.
+
+    Сбрасываются только периоды архива с датой новости, а при переносе
+    новости на другую дату — и периоды с прежней датой.
+    """
+    bump_version(NEWS_LIST_VERSION_KEY)
+    bump_version(NEWS_DETAIL_VERSION_KEY.format(instance.pk))
+    date_field = sender._meta.get_field('date')
+    bump_archive_versions({
+        date_field.to_python(news_date)
+        for news_date in (
+            instance.date, getattr(instance, 'loaded_date', None)
+        )
+        if news_date is not None
+    })
+    instance.loaded_date = instance.date
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_comment_news(sender, instance, **kwargs):
+    """Изменение комментария сбрасывает кеш главной и страницы новости."""
+    if comment_signals_muted.get():
+        return
+    bump_version(NEWS_LIST_VERSION_KEY)
+    bump_version(NEWS_DETAIL_VERSION_KEY.format(instance.news_id))
+
+
+def change_comments_count(news_id, delta):
+    """Счётчик не уходит ниже нуля, даже если успел разойтись."""
+    News.objects.filter(pk=news_id).update(
+        comments_count=Greatest(F('comments_count') + delta, 0)
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    """
+    Поддерживает счётчик одобренных комментариев новости.
+
+    Срабатывает для записей и из представлений, и из админки. Перенос
+    комментария к другой новости меняет оба счётчика, снятие и возврат
+    одобрения — счётчик его новости. Загрузка фикстур счётчик не
+    трогает: его пересчитывает команда recount_comments.
+    """
+    if raw:
+        return
+    if created:
+        loaded = (None, False)
+    else:
+        loaded = (
+            getattr(instance, 'loaded_news_id', instance.news_id),
+            getattr(instance, 'loaded_is_approved', instance.is_approved),
+        )
+    saved = (instance.news_id, instance.is_approved)
+    if loaded != saved:
+        loaded_news_id, loaded_is_approved = loaded
+        if loaded_is_approved:
+            change_comments_count(loaded_news_id, -1)
+        if instance.is_approved:
+            change_comments_count(instance.news_id, 1)
+    instance.loaded_news_id, instance.loaded_is_approved = saved
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Удаление вместе с новостью или пачкой счётчик не трогает."""
+    if instance.is_approved and not comment_signals_muted.get():
+        change_comments_count(instance.news_id, -1)
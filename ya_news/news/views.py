@@ -1,11 +1,34 @@
+import asyncio
+from datetime import date, timedelta
+from functools import wraps
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.core.cache import cache
+from django.core.exceptions import BadRequest
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import salted_hmac
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .cache import (
+    NEWS_ARCHIVE_VERSION_KEY, NEWS_DETAIL_VERSION_KEY, NEWS_LIST_VERSION_KEY,
+    get_archive_periods, get_version
+)
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import (
+    CURSOR_SEPARATOR, decode_news_cursor, get_comments_page, get_news_page
+)
+from .search import search_news
 
 
 class NewsList(generic.ListView):
@@ -17,23 +40,176 @@ class NewsList(generic.ListView):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Число комментариев
+        хранится в самой новости, поэтому комментарии не загружаются и не
+        подсчитываются.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get_context_data(self, **kwargs):
+        """
+        Список на странице кешируется фрагментом шаблона.
+
+        Ключ фрагмента содержит версию, которую сбрасывают сигналы при
+        изменении новостей и комментариев. Пока фрагмент в кеше, ленивый
+        queryset так и не выполняется.
+        """
+        context = super().get_context_data(**kwargs)
+        context['cache_timeout'] = settings.NEWS_LIST_CACHE_TIMEOUT
+        context['cache_version'] = get_version(NEWS_LIST_VERSION_KEY)
+        return context
+
+
+class NewsArchive(generic.TemplateView):
+    """
+    Архив новостей за год, месяц или день.
+
+    Новости периода выбираются по диапазону дат и листаются по курсору
+    вдоль индекса news_date_id_idx. Каждая страница кешируется с версией
+    своего периода: её сбрасывают только изменения новостей этого
+    периода, поэтому правки свежих новостей не вытесняют старый архив.
+    Счётчик комментариев архив не показывает, и комментарии кеш архива
+    не сбрасывают.
+    """
+    template_name = 'news/archive.html'
+
+    def get_period(self):
+        """Начало периода, его конец (не включая) и ключ периода."""
+        year = self.kwargs['year']
+        month = self.kwargs.get('month')
+        day = self.kwargs.get('day')
+        try:
+            if day is not None:
+                start = date(year, month, day)
+                end = start + timedelta(days=1)
+            elif month is not None:
+                start = date(year, month, 1)
+                end = date(year + month // 12, month % 12 + 1, 1)
+            else:
+                start = date(year, 1, 1)
+                end = date(year + 1, 1, 1)
+        except (ValueError, OverflowError):
+            raise Http404('Некорректная дата.')
+        level = 2 if day is not None else 1 if month is not None else 0
+        return start, end, get_archive_periods(start)[level]
+
+    def get_cursor(self):
+        """
+        Курсор из запроса в каноническом виде.
+
+        Разные записи одного курсора дают один ключ кеша, а произвольные
+        строки не создают в кеше новых ключей.
+        """
+        cursor = self.request.GET.get('cursor')
+        if not cursor:
+            return ''
+        try:
+            news_date, pk = decode_news_cursor(cursor)
+        except ValueError:
+            raise BadRequest('Некорректный курсор.')
+        return f'{news_date.isoformat()}{CURSOR_SEPARATOR}{pk}'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        start, end, period = self.get_period()
+        cursor = self.get_cursor()
+        key = 'news:archive:{}:{}:{}'.format(
+            period, get_version(NEWS_ARCHIVE_VERSION_KEY.format(period)),
+            cursor
+        )
+        page = cache.get(key)
+        if page is None:
+            page = get_news_page(
+                News.objects.filter(date__gte=start), cursor=cursor, until=end
+            )
+            cache.set(key, page, settings.NEWS_LIST_CACHE_TIMEOUT)
+        context['news_list'], context['next_cursor'] = page
+        context['period'] = period
+        return context
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по заголовкам и текстам новостей."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        try:
+            context['news_list'], context['next_cursor'] = get_news_page(
+                search_news(query), cursor=self.request.GET.get('cursor')
+            )
+        except ValueError:
+            raise BadRequest('Некорректный курсор.')
+        context['query'] = query
+        return context
+
+
+class CommentsPageMixin:
+    """Добавляет в контекст первую страницу комментариев к новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'], context['next_cursor'] = get_comments_page(
+            self.object.pk
+        )
+        return context
 
 
-class NewsDetail(generic.DetailView):
+def get_news_state(request, pk):
+    """
+    Дата новости, время последнего комментария и число комментариев.
+
+    Вычисляется одним лёгким запросом и запоминается в запросе, чтобы
+    асинхронное представление и ETag не обращались к базе дважды.
+    """
+    if not hasattr(request, 'news_state'):
+        request.news_state = News.objects.filter(pk=pk).aggregate(
+            date=Max('date'),
+            last_comment=Max('comment__created'),
+            comments=Count('comment'),
+        )
+    return request.news_state
+
+
+def news_etag(request, pk, *args, **kwargs):
+    """
+    Значение ETag для страницы новости.
+
+    Версия из кеша учитывает правки текста новости и комментариев, а
+    пользователь — различия в разметке для автора комментариев. Форма
+    комментария несёт токен CSRF, который при входе меняется вместе с
+    ключом сессии, поэтому для вошедшего пользователя в ETag входит и
+    хеш ключа: страница прежней сессии с устаревшим токеном не подойдёт.
+    Last-Modified не отдаётся: по дате новости и комментариев правки
+    текста и разметка для разных пользователей не видны.
+    """
+    state = get_news_state(request, pk)
+    if state['date'] is None:
+        return None
+    session = '0'
+    if request.user.is_authenticated:
+        session = salted_hmac(
+            'news.views.news_etag', request.session.session_key
+        ).hexdigest()[:16]
+    return '{}-{}-{}-{}-{}-{}-{}'.format(
+        pk,
+        state['date'].isoformat(),
+        state['last_comment'].timestamp() if state['last_comment'] else 0,
+        state['comments'],
+        get_version(NEWS_DETAIL_VERSION_KEY.format(pk)),
+        request.user.pk or 0,
+        session,
+    )
+
+
+@method_decorator(condition(etag_func=news_etag), name='dispatch')
+class NewsDetail(CommentsPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -44,6 +220,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -55,7 +232,9 @@ class NewsComment(
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
+    @transaction.atomic
     def form_valid(self, form):
+        """Комментарий и счётчик комментариев новости меняются вместе."""
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
@@ -63,8 +242,9 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
@@ -78,14 +258,30 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+class NewsCommentsPage(generic.TemplateView):
+    """Следующая страница комментариев к новости для кнопки «Показать ещё»."""
+    template_name = 'news/includes/comments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            context['comments'], context['next_cursor'] = get_comments_page(
+                self.kwargs['pk'], cursor=self.request.GET.get('cursor')
+            )
+        except ValueError:
+            raise BadRequest('Некорректный курсор.')
+        context['news_id'] = self.kwargs['pk']
+        return context
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Комментарий уже загружен представлением, новость не нужна."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
@@ -102,3 +298,110 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        """Комментарий и счётчик комментариев новости меняются вместе."""
+        return super().delete(request, *args, **kwargs)
+
+
+def closing_connections(func):
+    """Закрывает устаревшие подключения потока, как в конце запроса."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    Выполняет синхронный код асинхронного представления в потоке.
+
+    Каждый вызов получает свой поток и своё подключение, поэтому чтения
+    внутри asyncio.gather идут одновременно. Базу SQLite в памяти (и
+    незафиксированную транзакцию теста) видит только одно подключение,
+    для неё вызовы выполняются в общем потоке запроса.
+    """
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        return await sync_to_async(func)(*args, **kwargs)
+    return await sync_to_async(
+        closing_connections(func), thread_sensitive=False
+    )(*args, **kwargs)
+
+
+def get_news_list_context():
+    """
+    Контекст главной страницы для news_list_async.
+
+    Как и в NewsList, queryset ленивый: шаблон выполняет его, только если
+    фрагмента списка нет в кеше.
+    """
+    version = get_version(NEWS_LIST_VERSION_KEY)
+    return {
+        'object_list': News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE],
+        'cache_timeout': settings.NEWS_LIST_CACHE_TIMEOUT,
+        'cache_version': version,
+    }
+
+
+async def news_list_async(request):
+    """Асинхронный вариант NewsList: цикл событий не ждёт базу и шаблон."""
+    context = await run_sync(get_news_list_context)
+    return await run_sync(render, request, NewsList.template_name, context)
+
+
+def get_news_etag(request, pk):
+    """Значение ETag, как у condition для NewsDetail."""
+    etag = news_etag(request, pk)
+    if etag is None:
+        raise Http404('Новость не найдена.')
+    return quote_etag(etag)
+
+
+news_comment_view = NewsComment.as_view()
+# require_http_methods в Django 3.2 не оборачивает асинхронные представления.
+NEWS_DETAIL_METHODS = ('GET', 'HEAD', 'POST')
+
+
+async def news_detail_async(request, pk):
+    """
+    Асинхронный вариант NewsDetailView.
+
+    Пользователь и состояние новости для ETag загружаются одновременно.
+    Если страница не изменилась, ответ 304 возвращается без загрузки
+    новости, иначе новость и первая страница комментариев тоже
+    загружаются одновременно. Комментарий отправляется синхронным
+    NewsComment, остальные методы не разрешены.
+    """
+    if request.method not in NEWS_DETAIL_METHODS:
+        return HttpResponseNotAllowed(NEWS_DETAIL_METHODS)
+    if request.method == 'POST':
+        return await sync_to_async(news_comment_view)(request, pk=pk)
+    is_authenticated, _ = await asyncio.gather(
+        run_sync(lambda: request.user.is_authenticated),
+        run_sync(get_news_state, request, pk),
+    )
+    etag = await run_sync(get_news_etag, request, pk)
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+    news, (comments, next_cursor) = await asyncio.gather(
+        run_sync(get_object_or_404, News, pk=pk),
+        run_sync(get_comments_page, pk),
+    )
+    context = {
+        'object': news,
+        'news': news,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    }
+    if is_authenticated:
+        context['form'] = CommentForm()
+    response = await run_sync(
+        render, request, NewsDetail.template_name, context
+    )
+    response.headers['ETag'] = etag
+    return response
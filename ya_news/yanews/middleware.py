@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .routers import read_from_primary
+
+PIN_SESSION_KEY = 'read_from_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReadYourWritesMiddleware:
+    """
+    Привязывает чтение к основной базе после записи.
+
+    Успешный небезопасный запрос (комментарий, его правка или удаление)
+    на REPLICA_LAG_SECONDS переводит чтение этой сессии на основную базу,
+    чтобы пользователь после редиректа увидел свои изменения даже при
+    отставании реплик. Без реплик middleware ничего не делает. Работает и
+    в синхронной, и в асинхронной цепочке, чтобы под ASGI асинхронные
+    представления не переводились в отдельный поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            # Так же помечает себя MiddlewareMixin из Django.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        token = read_from_primary.set(self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_primary.reset(token)
+        self.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        token = read_from_primary.set(
+            await sync_to_async(self.is_pinned)(request)
+        )
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_from_primary.reset(token)
+        self.pin(request, response)
+        return response
+
+    @staticmethod
+    def is_pinned(request):
+        return request.session.get(PIN_SESSION_KEY, 0) > time.time()
+
+    @staticmethod
+    def pin(request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            request.session[PIN_SESSION_KEY] = (
+                time.time() + settings.REPLICA_LAG_SECONDS
+            )
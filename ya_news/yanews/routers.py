@@ -0,0 +1,44 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# None вне запроса, внутри запроса — нужно ли читать с основной базы.
+read_from_primary = ContextVar('read_from_primary', default=None)
+
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтение с реплик, запись в основную базу.
+
+    Реплики перечисляются в настройке DATABASE_REPLICAS. Сессии всегда
+    читаются с основной базы: иначе только что вошедший пользователь
+    может не найти свою сессию на отстающей реплике. Запрос, который уже
+    что-то записал, и сессия, недавно выполнявшая запись, тоже читают с
+    основной базы, чтобы видеть свои изменения.
+    """
+    primary = DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.DATABASE_REPLICAS
+            or read_from_primary.get()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+        ):
+            return self.primary
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if read_from_primary.get() is not None:
+            read_from_primary.set(True)
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Реплики получают схему репликацией, а не миграциями."""
+        return db not in settings.DATABASE_REPLICAS
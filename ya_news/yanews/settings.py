@@ -1,9 +1,14 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общие для обоих проектов модули лежат в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
 DEBUG = True
@@ -17,12 +22,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'common.apps.CommonConfig',
     'news.apps.NewsConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'yanews.middleware.ReadYourWritesMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -58,6 +65,43 @@ DATABASES = {
     }
 }
 
+DATABASE_ROUTERS = ['yanews.routers.PrimaryReplicaRouter']
+
+DATABASE_REPLICAS = []
+
+REPLICA_LAG_SECONDS = 5
+
+# Пустой словарь — подключения к SQLite не донастраиваются.
+SQLITE_PRAGMAS = {}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Отдельный кеш, чтобы сессии не вытесняли фрагменты страниц.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Хранилище сессий выбирается переменной окружения DJANGO_SESSION_BACKEND:
+# db — сессия читается из базы на каждый запрос; cached_db — из кеша
+# sessions, в базу только записывается (при нескольких процессах кеш
+# должен быть общим, иначе выход не отзовёт сессию в других процессах);
+# signed_cookies — сессия целиком хранится в подписанной cookie, база не
+# нужна вовсе.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[
+    os.environ.get('DJANGO_SESSION_BACKEND', 'db')
+]
+SESSION_CACHE_ALIAS = 'sessions'
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +124,9 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+NEWS_LIST_CACHE_TIMEOUT = 60 * 15
+
+NEWS_COUNT_ON_ARCHIVE_PAGE = 20
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 20
@@ -1,5 +1,23 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from common.admin import UsernamePrefixSearchMixin
 from .models import Note
 
-admin.site.register(Note)
+User = get_user_model()
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(UsernamePrefixSearchMixin, BaseUserAdmin):
+    """Автор заметки выбирается автодополнением по началу имени."""
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'author', 'modified')
+    list_select_related = ('author',)
+    autocomplete_fields = ('author',)
@@ -1,29 +1,19 @@
-from pytils.translit import slugify
-
 from django import forms
-from django.core.exceptions import ValidationError
 
 from .models import Note
-
-WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
+# Сообщение о занятом slug формирует проверка уникальности модели.
+from .models import WARNING  # noqa: F401
 
 
 class NoteForm(forms.ModelForm):
-    """Форма для создания или обновления заметки."""
+    """
+    Форма для создания или обновления заметки.
+
+    Уникальность заполненного slug проверяет модель; пустой slug подбирает
+    Note.save с суффиксом, поэтому заметки с одинаковыми заголовками не
+    конфликтуют.
+    """
 
     class Meta:
         model = Note
         fields = ('title', 'text', 'slug')
-
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
@@ -0,0 +1,45 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки в формате JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или «-» для стандартного вывода.'
+        )
+        parser.add_argument(
+            '--author', help='Выгрузить только заметки пользователя.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, path, author, chunk_size, **options):
+        """
+        Заметки читаются курсором порциями по chunk_size строк.
+
+        Ни queryset, ни выгрузка целиком в памяти не держатся.
+        """
+        notes = Note.objects.order_by('pk')
+        if author:
+            notes = notes.filter(author__username=author)
+        notes = notes.values(
+            'title', 'text', 'slug', 'author__username'
+        ).iterator(chunk_size=chunk_size)
+        file = sys.stdout if path == '-' else open(
+            path, 'w', encoding='utf-8'
+        )
+        exported = 0
+        try:
+            for note in notes:
+                note['author'] = note.pop('author__username')
+                file.write(json.dumps(note, ensure_ascii=False) + '\n')
+                exported += 1
+        finally:
+            if file is not sys.stdout:
+                file.close()
+        self.stderr.write(f'Выгружено заметок: {exported}.')
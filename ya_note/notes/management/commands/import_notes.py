@@ -0,0 +1,118 @@
+import json
+import sys
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from notes.models import SLUG_ATTEMPTS, Note
+from notes.slugs import allocate_slugs, make_slug, normalize_slug
+
+REQUIRED_FIELDS = ('author', 'title', 'text')
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует заметки из файла JSON Lines: по объекту с полями '
+        'title, text, author (имя пользователя) и необязательным slug '
+        'в каждой строке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или «-» для стандартного ввода.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, path, chunk_size, **options):
+        file = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        imported = skipped = 0
+        start = time.monotonic()
+        try:
+            lines = (
+                (number, line) for number, line in enumerate(file, 1)
+                if line.strip()
+            )
+            while True:
+                chunk = list(islice(lines, chunk_size))
+                if not chunk:
+                    break
+                created, missing = self.import_chunk(chunk)
+                imported += created
+                skipped += missing
+                rate = imported / (time.monotonic() - start)
+                self.stdout.write(
+                    f'Импортировано заметок: {imported}, '
+                    f'пропущено: {skipped} ({rate:.0f} заметок/с)'
+                )
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {imported} заметок за '
+            f'{time.monotonic() - start:.1f} с.'
+        ))
+
+    def parse_record(self, number, line):
+        """Запись из строки файла; ошибка указывает номер строки."""
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise CommandError(f'Строка {number}: некорректный JSON: {error}')
+        if not isinstance(record, dict):
+            raise CommandError(f'Строка {number}: ожидается объект JSON.')
+        for field in REQUIRED_FIELDS:
+            if not isinstance(record.get(field), str):
+                raise CommandError(
+                    f'Строка {number}: поле {field} должно быть строкой.'
+                )
+        slug = record.get('slug')
+        if slug is not None and not isinstance(slug, str):
+            raise CommandError(f'Строка {number}: slug должен быть строкой.')
+        title_length = Note._meta.get_field('title').max_length
+        if len(record['title']) > title_length:
+            raise CommandError(
+                f'Строка {number}: заголовок длиннее {title_length} символов.'
+            )
+        return record
+
+    def import_chunk(self, chunk):
+        """
+        Записывает пачку заметок одним bulk_create.
+
+        Авторы пачки загружаются одним запросом, слаги подбираются так же,
+        как в Note.save, но для всей пачки сразу. Если слаг успел занять
+        параллельный запрос, пачка записывается заново.
+        """
+        records = [self.parse_record(number, line) for number, line in chunk]
+        authors = get_user_model().objects.in_bulk(
+            {record['author'] for record in records}, field_name='username'
+        )
+        records = [record for record in records if record['author'] in authors]
+        max_slug_length = Note._meta.get_field('slug').max_length
+        bases = [
+            normalize_slug(record.get('slug') or '', max_slug_length)
+            or make_slug(record['title'], max_slug_length)
+            for record in records
+        ]
+        for attempt in range(SLUG_ATTEMPTS):
+            slugs = allocate_slugs(Note.objects, bases, max_slug_length)
+            notes = [
+                Note(
+                    title=record['title'],
+                    text=record['text'],
+                    slug=slug,
+                    author=authors[record['author']],
+                )
+                for record, slug in zip(records, slugs)
+            ]
+            try:
+                with transaction.atomic():
+                    Note.objects.bulk_create(notes)
+                break
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS - 1:
+                    raise
+        return len(records), len(chunk) - len(records)
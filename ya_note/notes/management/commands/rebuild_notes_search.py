@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.search import is_fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс заметок.'
+
+    def handle(self, *args, **options):
+        """
+        Индекс поддерживается триггерами, команда нужна после загрузки
+        данных в обход SQL (например, копированием файла базы) или для
+        его оптимизации.
+        """
+        if not is_fts_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        rebuild_index()
+        self.stdout.write('Индекс заметок перестроен.')
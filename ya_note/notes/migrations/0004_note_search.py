@@ -0,0 +1,71 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    # Внешнее содержимое: FTS5 хранит только индекс, тексты читаются из
+    # notes_note по rowid = id. Префиксные индексы ускоряют поиск по
+    # началу слова.
+    """
+    CREATE VIRTUAL TABLE notes_note_search USING fts5(
+        title, text, author_id,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_note_search_insert AFTER INSERT ON notes_note
+    BEGIN
+        INSERT INTO notes_note_search(rowid, title, text, author_id)
+        VALUES (new.id, new.title, new.text, new.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_search_delete AFTER DELETE ON notes_note
+    BEGIN
+        INSERT INTO notes_note_search(
+            notes_note_search, rowid, title, text, author_id
+        ) VALUES ('delete', old.id, old.title, old.text, old.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_search_update
+    AFTER UPDATE OF title, text, author_id ON notes_note
+    BEGIN
+        INSERT INTO notes_note_search(
+            notes_note_search, rowid, title, text, author_id
+        ) VALUES ('delete', old.id, old.title, old.text, old.author_id);
+        INSERT INTO notes_note_search(rowid, title, text, author_id)
+        VALUES (new.id, new.title, new.text, new.author_id);
+    END
+    """,
+    "INSERT INTO notes_note_search(notes_note_search) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS notes_note_search_insert',
+    'DROP TRIGGER IF EXISTS notes_note_search_delete',
+    'DROP TRIGGER IF EXISTS notes_note_search_update',
+    'DROP TABLE IF EXISTS notes_note_search',
+)
+
+
+def run_on_sqlite(statements):
+    """FTS5 есть только в SQLite, на других базах миграция пустая."""
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.conf import settings
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import allocate_slug, make_slug
+
+SLUG_ATTEMPTS = 3
+WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
 
 class Note(models.Model):
@@ -27,12 +31,47 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    modified = models.DateTimeField('Изменена', auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
 
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
+    def validate_unique(self, exclude=None):
+        """Пустой slug подбирает save, проверять его уникальность рано."""
         if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+            exclude = [*(exclude or ()), 'slug']
+        super().validate_unique(exclude)
+
+    def unique_error_message(self, model_class, unique_check):
+        if unique_check == ('slug',):
+            return ValidationError(self.slug + WARNING, code='unique')
+        return super().unique_error_message(model_class, unique_check)
+
+    def save(self, *args, **kwargs):
+        """
+        Пустой slug формируется из заголовка.
+
+        При совпадении добавляется суффикс: slug-2, slug-3… Если между
+        подбором и записью слаг занял параллельный запрос, подбор
+        повторяется.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = make_slug(self.title, max_slug_length)
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = allocate_slug(
+                Note.objects, base, max_slug_length, exclude_pk=self.pk
+            )
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS - 1:
+                    self.slug = ''
+                    raise
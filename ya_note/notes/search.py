@@ -0,0 +1,117 @@
+"""
+Полнотекстовый поиск по заметкам.
+
+На SQLite поиск идёт по виртуальной таблице FTS5 notes_note_search с
+внешним содержимым: сами тексты хранятся только в notes_note, а индекс
+поддерживают триггеры из миграции 0004, поэтому его обновляют и save(),
+и bulk_create, и update(), и удаление. Автор тоже проиндексирован, и
+ограничение по нему FTS5 применяет внутри индекса, не перебирая чужие
+заметки.
+"""
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Note
+
+SEARCH_TABLE = 'notes_note_search'
+# Совпадения в снипете помечаются символами из области для частного
+# использования: их не бывает в тексте, и разметку <mark> можно
+# добавить уже после экранирования текста заметки.
+MATCH_START, MATCH_END = '\ue000', '\ue001'
+SNIPPET_TOKENS = 12
+# Веса bm25 для колонок title, text и author_id.
+COLUMN_WEIGHTS = (10.0, 1.0, 0.0)
+
+SearchResult = namedtuple('SearchResult', ('id', 'slug', 'title', 'snippet'))
+
+SEARCH_SQL = f'''
+    SELECT note.id, note.slug, note.title,
+           snippet({SEARCH_TABLE}, 1, %s, %s, '…', {SNIPPET_TOKENS})
+    FROM {SEARCH_TABLE}
+    JOIN notes_note AS note ON note.id = {SEARCH_TABLE}.rowid
+    WHERE {SEARCH_TABLE} MATCH %s
+    ORDER BY bm25({SEARCH_TABLE}, {', '.join(map(str, COLUMN_WEIGHTS))})
+    LIMIT %s
+'''
+
+
+def is_fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def get_terms(query):
+    """Слова запроса; операторы FTS5 из пользовательского ввода не берутся."""
+    return re.findall(r'\w+', query.lower())
+
+
+def build_match(author_id, terms):
+    """
+    Выражение MATCH: все слова в заголовке или тексте заметки автора.
+
+    Каждое слово — отдельная фраза в кавычках, последнее ищется по
+    префиксу, чтобы находить заметки по началу слова при наборе.
+    """
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += '*'
+    return (
+        f'author_id : "{author_id}" AND '
+        f'{{title text}} : ({" ".join(phrases)})'
+    )
+
+
+def highlight(snippet):
+    """Экранирует снипет и заменяет маркеры совпадений на <mark>."""
+    return mark_safe(
+        escape(snippet).replace(MATCH_START, '<mark>').replace(
+            MATCH_END, '</mark>'
+        )
+    )
+
+
+def search_notes(author, query, limit=None):
+    """
+    Заметки автора, подходящие под запрос, от самых релевантных.
+
+    Без FTS5 (не SQLite) выполняется простой поиск по вхождению
+    подстроки, а снипетом служит начало текста.
+    """
+    if limit is None:
+        limit = settings.NOTES_SEARCH_RESULTS
+    terms = get_terms(query)
+    if not terms:
+        return []
+    if not is_fts_available():
+        notes = Note.objects.filter(author=author)
+        for term in terms:
+            notes = notes.filter(Q(title__icontains=term)
+                                 | Q(text__icontains=term))
+        return [
+            SearchResult(note.id, note.slug, note.title,
+                         escape(note.text[:200]))
+            for note in notes.order_by('pk')[:limit]
+        ]
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, (
+            MATCH_START, MATCH_END, build_match(author.pk, terms), limit
+        ))
+        return [
+            SearchResult(pk, slug, title, highlight(snippet))
+            for pk, slug, title, snippet in cursor.fetchall()
+        ]
+
+
+def rebuild_index():
+    """Перестраивает индекс по таблице заметок и оптимизирует его."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
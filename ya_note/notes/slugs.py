@@ -0,0 +1,105 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db.models import Q
+from pytils.translit import slugify
+
+from common.admin import PREFIX_END
+
+DEFAULT_SLUG = 'note'
+# Место под суффикс вида «-1234567» у слагов максимальной длины.
+SUFFIX_RESERVE = 8
+# SQLite ограничивает глубину выражения, поэтому условия по основам
+# объединяются в запросы порциями.
+BASES_PER_QUERY = 200
+
+
+def make_slug(title, max_length):
+    """Слаг из заголовка, как его строит pytils."""
+    return slugify(title)[:max_length] or DEFAULT_SLUG
+
+
+def normalize_slug(slug, max_length):
+    """
+    Слаг из внешних данных.
+
+    Допустимый слаг остаётся как есть, остальные строятся через pytils,
+    длина обрезается до max_length.
+    """
+    try:
+        validate_slug(slug)
+    except ValidationError:
+        slug = slugify(slug)
+    return slug[:max_length]
+
+
+def with_suffix(base, number, max_length):
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def pick_free_slug(base, taken, max_length):
+    """Первый свободный слаг из base, base-2, base-3…"""
+    slug, number = base, 1
+    while slug in taken:
+        number += 1
+        slug = with_suffix(base, number, max_length)
+    return slug
+
+
+def collision_condition(base, max_length):
+    """
+    Слаги, с которыми может совпасть слаг из base: сам base и base-N.
+
+    У длинной основы суффикс вытесняет её конец, поэтому берутся все
+    слаги с укороченным началом. Начало ищется диапазоном по уникальному
+    индексу: LIKE в SQLite не учитывает регистр и индекс не использует.
+    """
+    prefix = base[:max_length - SUFFIX_RESERVE]
+    if prefix != base:
+        return Q(slug__gte=prefix, slug__lt=prefix + PREFIX_END)
+    return Q(slug=base) | Q(
+        slug__gte=base + '-', slug__lt=base + '-' + PREFIX_END
+    )
+
+
+def find_taken_slugs(queryset, bases, max_length, exclude_pk=None):
+    """
+    Занятые слаги, с которыми возможна коллизия у переданных основ.
+
+    Один запрос по диапазонам индекса забирает все такие слаги, дальше
+    свободные варианты выбираются без обращений к базе.
+    """
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), BASES_PER_QUERY):
+        condition = Q()
+        for base in bases[start:start + BASES_PER_QUERY]:
+            condition |= collision_condition(base, max_length)
+        taken.update(
+            queryset.filter(condition).exclude(
+                pk=exclude_pk
+            ).values_list('slug', flat=True)
+        )
+    return taken
+
+
+def allocate_slug(queryset, base, max_length, exclude_pk=None):
+    """Свободный слаг для одной заметки одним запросом."""
+    taken = find_taken_slugs(queryset, (base,), max_length, exclude_pk)
+    return pick_free_slug(base, taken, max_length)
+
+
+def allocate_slugs(queryset, bases, max_length):
+    """
+    Свободные слаги для пачки заметок.
+
+    Слаги, выданные внутри пачки, тоже считаются занятыми, поэтому
+    одинаковые заголовки получают разные суффиксы.
+    """
+    taken = find_taken_slugs(queryset, bases, max_length)
+    slugs = []
+    for base in bases:
+        slug = pick_free_slug(base, taken, max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -0,0 +1,104 @@
+from http import HTTPStatus
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+
+
+class TestNoteAdmin(TestCase):
+    """Тестирование админки заметок при большом числе пользователей."""
+
+    USERS_COUNT = 2000
+    USER = 'пользователь'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='администратор')
+        cls.note = Note.objects.create(title='заголовок', text='текст',
+                                       slug='slug', author=cls.admin)
+        cls.change_url = reverse('admin:notes_note_change',
+                                 args=(cls.note.pk,))
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def get_change_page(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.change_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(context), len(response.content)
+
+    def test_change_page_does_not_depend_on_users(self):
+        """Автор выбирается автодополнением, а не списком всех."""
+        # Первый запрос ещё заполняет кеш типов содержимого.
+        self.get_change_page()
+        queries, size = self.get_change_page()
+        User.objects.bulk_create(
+            User(username=f'{self.USER}{index}')
+            for index in range(self.USERS_COUNT)
+        )
+        self.assertEqual(self.get_change_page(), (queries, size))
+
+    def test_changelist_loads_authors_with_notes(self):
+        """Авторы заметок в списке загружаются тем же запросом."""
+        url = reverse('admin:notes_note_changelist')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url)
+        for index in range(5):
+            Note.objects.create(
+                title='заметка', text='текст', slug=f'note-{index}',
+                author=User.objects.create(username=f'{self.USER}{index}')
+            )
+        with self.assertNumQueries(len(context)):
+            self.client.get(url)
+
+    @skipUnless(connection.vendor == 'sqlite',
+                'План запроса проверяется через EXPLAIN QUERY PLAN SQLite.')
+    def test_user_autocomplete_uses_username_index(self):
+        """Автодополнение ищет начало имени диапазоном по индексу."""
+        User.objects.bulk_create(
+            User(username=f'{self.USER}{index}') for index in range(30)
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('admin:autocomplete'), {
+                'term': f'{self.USER}2', 'app_label': 'notes',
+                'model_name': 'note', 'field_name': 'author',
+            })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            [result['text'] for result in response.json()['results']],
+            [f'{self.USER}2', *(f'{self.USER}2{index}' for index in range(10))]
+        )
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if '"auth_user"."username" >=' in query['sql']
+        ]
+        # Подсчёт для пагинации и сама страница результатов.
+        self.assertEqual(len(queries), 2)
+        for sql in queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            self.assertTrue(
+                any('(username>? AND username<?)' in step for step in plan),
+                plan
+            )
+
+    def test_user_changelist_keeps_stock_search(self):
+        """В списке пользователей поиск ищет и по email, и по части имени."""
+        user = User.objects.create(
+            username=f'{self.USER}1', email='reader@example.com'
+        )
+        url = reverse('admin:auth_user_changelist')
+        for query in ('reader@example', 'ьзовател'):
+            with self.subTest(query=query):
+                response = self.client.get(url, {'q': query})
+                self.assertEqual(
+                    list(response.context['cl'].result_list), [user]
+                )
@@ -0,0 +1,115 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from pytils.translit import slugify
+
+from notes.models import Note
+
+
+class TestImportExportNotes(TestCase):
+    """Тестирование импорта и выгрузки заметок в формате JSON Lines."""
+
+    AUTHOR = 'автор_заметки'
+    TITLE = 'заголовок_заметки'
+    NOTES_COUNT = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username=cls.AUTHOR)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'notes.jsonl'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_records(self, records):
+        self.path.write_text(
+            ''.join(
+                json.dumps(record, ensure_ascii=False) + '\n'
+                for record in records
+            ),
+            encoding='utf-8'
+        )
+
+    def test_import_allocates_slugs_in_batch(self):
+        """Одинаковые заголовки получают суффиксы, как в Note.save."""
+        Note.objects.create(title=self.TITLE, text='текст',
+                            author=self.author)
+        self.write_records(
+            {'title': self.TITLE, 'text': f'текст {index}',
+             'author': self.AUTHOR}
+            for index in range(self.NOTES_COUNT)
+        )
+        # Авторы, слаги, точка сохранения, вставка и её освобождение.
+        with self.assertNumQueries(5):
+            call_command('import_notes', str(self.path), stdout=StringIO())
+        base = slugify(self.TITLE)
+        self.assertEqual(
+            set(Note.objects.values_list('slug', flat=True)),
+            {base} | {f'{base}-{number}'
+                      for number in range(2, self.NOTES_COUNT + 2)}
+        )
+
+    def test_import_skips_unknown_authors(self):
+        """Заметки несуществующих пользователей пропускаются."""
+        self.write_records((
+            {'title': 'первая', 'text': 'текст', 'author': self.AUTHOR},
+            {'title': 'вторая', 'text': 'текст', 'author': 'неизвестный'},
+        ))
+        call_command('import_notes', str(self.path), stdout=StringIO())
+        self.assertEqual(
+            list(Note.objects.values_list('title', flat=True)), ['первая']
+        )
+
+    def test_import_reports_bad_record(self):
+        """Запись без обязательного поля останавливает импорт с её номером."""
+        self.write_records((
+            {'title': 'первая', 'text': 'текст', 'author': self.AUTHOR},
+            {'title': 'вторая', 'author': self.AUTHOR},
+        ))
+        with self.assertRaisesMessage(CommandError, 'Строка 2: поле text'):
+            call_command('import_notes', str(self.path), stdout=StringIO())
+        self.assertFalse(Note.objects.exists())
+
+    def test_import_normalizes_slugs(self):
+        """Заданные slug приводятся к допустимому виду и длине."""
+        max_length = Note._meta.get_field('slug').max_length
+        self.write_records(
+            {'title': 'заметка', 'text': 'текст', 'author': self.AUTHOR,
+             'slug': slug}
+            for slug in ('new_slug', 'Моя заметка!', 'a' * (max_length + 10))
+        )
+        call_command('import_notes', str(self.path), stdout=StringIO())
+        self.assertEqual(
+            list(Note.objects.order_by('pk').values_list('slug', flat=True)),
+            ['new_slug', 'moya-zametka', 'a' * max_length]
+        )
+
+    def test_export_import_round_trip(self):
+        """Выгруженные заметки импортируются обратно без изменений."""
+        Note.objects.bulk_create(
+            Note(title=f'заметка {index}', text=f'текст {index}',
+                 slug=f'note-{index}', author=self.author)
+            for index in range(self.NOTES_COUNT)
+        )
+        expected = list(Note.objects.order_by('pk').values_list(
+            'title', 'text', 'slug', 'author'
+        ))
+        call_command('export_notes', str(self.path), chunk_size=3,
+                     stderr=StringIO())
+        Note.objects.all().delete()
+        call_command('import_notes', str(self.path), chunk_size=3,
+                     stdout=StringIO())
+        self.assertEqual(
+            list(Note.objects.order_by('pk').values_list(
+                'title', 'text', 'slug', 'author'
+            )),
+            expected
+        )
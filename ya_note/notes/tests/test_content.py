@@ -1,5 +1,11 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import skipUnless
+
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from notes.forms import NoteForm
@@ -37,7 +43,7 @@ class TestContent(TestCase):
         response = self.author_client.get(self.NOTE_LIST_URL)
         object_list = response.context['object_list']
         self.assertEqual(
-            object_list.count(),
+            len(object_list),
             1,
             'Проверьте что заметки пользователя передаются на страницу со '
             'списком заметок списке object_list в словаре context.'
@@ -53,7 +59,7 @@ class TestContent(TestCase):
         response = self.user_client.get(self.NOTE_LIST_URL)
         object_list = response.context['object_list']
         self.assertEqual(
-            object_list.count(),
+            len(object_list),
             0,
             'Проверьте что заметки одного пользователя не попадают в список '
             'заметок другого пользователя.'
@@ -67,3 +73,190 @@ class TestContent(TestCase):
                 response = self.author_client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+
+class TestConditionalGet(TestCase):
+    """Тестирование условных запросов к странице заметки."""
+
+    AUTHOR = 'автор_заметки'
+    SLUG = 'slug'
+
+    DETAIL_URL = reverse('notes:detail', args=(SLUG,))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username=cls.AUTHOR)
+        cls.note = Note.objects.create(title='заголовок', text='текст',
+                                       author=cls.author, slug=cls.SLUG)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_not_modified(self):
+        """Неизменившаяся заметка отдаётся ответом 304 одним запросом."""
+        response = self.author_client.get(self.DETAIL_URL)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        # Сессия и пользователь, затем один запрос времени изменения.
+        with self.assertNumQueries(3):
+            response = self.author_client.get(
+                self.DETAIL_URL, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_modified_after_edit(self):
+        """После изменения заметки страница отдаётся полностью."""
+        etag = self.author_client.get(self.DETAIL_URL)['ETag']
+        self.note.text = 'новый текст'
+        self.note.save()
+        response = self.author_client.get(
+            self.DETAIL_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+@override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+class TestNotesListPagination(TestCase):
+    """Тестирование постраничного списка заметок."""
+
+    AUTHOR = 'автор_заметки'
+    NOTES_COUNT = 5
+
+    LIST_URL = reverse('notes:list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username=cls.AUTHOR)
+        Note.objects.bulk_create(
+            Note(title=f'заметка {index}', text='текст',
+                 slug=f'note-{index}', author=cls.author)
+            for index in range(cls.NOTES_COUNT)
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_pages_contain_all_notes_once(self):
+        """Страницы по курсору проходят все заметки автора без повторов."""
+        shown = []
+        response = self.author_client.get(self.LIST_URL)
+        while True:
+            object_list = response.context['object_list']
+            self.assertLessEqual(len(object_list), 2)
+            shown.extend(note.pk for note in object_list)
+            next_after = response.context['next_after']
+            if next_after is None:
+                break
+            response = self.author_client.get(
+                self.LIST_URL, {'after': next_after}
+            )
+        self.assertEqual(
+            shown,
+            list(Note.objects.order_by('pk').values_list('pk', flat=True))
+        )
+
+    def test_list_does_not_load_text(self):
+        """Текст заметок в список не загружается."""
+        response = self.author_client.get(self.LIST_URL)
+        for note in response.context['object_list']:
+            self.assertIn('text', note.get_deferred_fields())
+
+    def test_last_full_page_has_no_next(self):
+        """После полной последней страницы ссылки на следующую нет."""
+        last_pk = Note.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        )[2]
+        response = self.author_client.get(self.LIST_URL, {'after': last_pk})
+        self.assertEqual(len(response.context['object_list']), 2)
+        self.assertIsNone(response.context['next_after'])
+
+    def test_bad_cursor(self):
+        """Некорректный курсор приводит к ошибке 400."""
+        for after in ('x', str(2 ** 64), str(-2 ** 64)):
+            with self.subTest(after=after):
+                response = self.author_client.get(
+                    self.LIST_URL, {'after': after}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Индекс FTS5 есть только в SQLite.')
+class TestNoteSearch(TestCase):
+    """Тестирование полнотекстового поиска по заметкам."""
+
+    AUTHOR = 'автор_заметки'
+    USER = 'зарегистрированный_пользователь'
+
+    SEARCH_URL = reverse('notes:search')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username=cls.AUTHOR)
+        cls.user = User.objects.create_user(username=cls.USER)
+        cls.in_text = Note.objects.create(
+            title='покупки', text='купить <b>молоко</b> и хлеб',
+            author=cls.author, slug='in-text'
+        )
+        cls.in_title = Note.objects.create(
+            title='молоко', text='выбрать магазин',
+            author=cls.author, slug='in-title'
+        )
+        cls.foreign = Note.objects.create(
+            title='чужая', text='тоже про молоко',
+            author=cls.user, slug='foreign'
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def search(self, query):
+        response = self.author_client.get(self.SEARCH_URL, {'q': query})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.context['object_list']
+
+    def test_results_ranked_and_scoped_by_author(self):
+        """Совпадение в заголовке выше, чужие заметки не находятся."""
+        self.assertEqual(
+            [result.slug for result in self.search('Молоко')],
+            [self.in_title.slug, self.in_text.slug]
+        )
+
+    def test_snippet_escaped_and_highlighted(self):
+        """Текст заметки экранируется, совпадения выделяются."""
+        snippet = self.search('молоко')[1].snippet
+        self.assertIn('&lt;b&gt;<mark>молоко</mark>&lt;/b&gt;', snippet)
+        self.assertNotIn('<b>', snippet)
+
+    def test_prefix_and_all_words(self):
+        """Последнее слово ищется по началу, все слова обязательны."""
+        self.assertEqual(len(self.search('молоко хл')), 1)
+        self.assertEqual(len(self.search('молоко сыр')), 0)
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Операторы FTS5 в запросе не приводят к ошибке."""
+        for query in ('"', 'молоко OR', 'author_id: 1', '*', 'NEAR('):
+            with self.subTest(query=query):
+                self.search(query)
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при правке, удалении и bulk_create."""
+        self.in_text.text = 'купить кефир'
+        self.in_text.save()
+        self.assertEqual(len(self.search('кефир')), 1)
+        self.assertEqual(len(self.search('хлеб')), 0)
+        self.in_text.delete()
+        self.assertEqual(len(self.search('кефир')), 0)
+        Note.objects.bulk_create([Note(
+            title='сыр', text='текст', author=self.author, slug='bulk'
+        )])
+        self.assertEqual(len(self.search('сыр')), 1)
+
+    def test_rebuild_command(self):
+        """Команда перестраивает индекс без потери заметок."""
+        call_command('rebuild_notes_search', stdout=StringIO())
+        self.assertEqual(len(self.search('молоко')), 2)
@@ -1,12 +1,16 @@
 from http import HTTPStatus
+from unittest import mock, skipUnless
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import find_taken_slugs
 
 
 class TestCreateNote(TestCase):
@@ -118,6 +122,73 @@ class TestCreateNote(TestCase):
         self.assertEqual(note.author, self.user, 'Автор неверен')
 
 
+class TestSlugAllocation(TestCase):
+    """Тестирование подбора slug для заметок с одинаковыми заголовками."""
+
+    TITLE = 'заголовок_заметки'
+    USER = 'зарегистрированный_пользователь'
+
+    ADD_NOTE_URL = reverse('notes:add')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username=cls.USER)
+        cls.form_data = {'title': cls.TITLE, 'text': 'текст_заметки'}
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(self.user)
+
+    def test_same_titles_get_suffixes(self):
+        """Заметки с одинаковыми заголовками получают slug-2, slug-3."""
+        for _ in range(3):
+            self.auth_client.post(self.ADD_NOTE_URL, data=self.form_data)
+        base = slugify(self.TITLE)
+        self.assertEqual(
+            list(Note.objects.order_by('pk').values_list('slug', flat=True)),
+            [base, f'{base}-2', f'{base}-3'],
+            'Убедитесь, что к совпадающим slug добавляется суффикс.'
+        )
+
+    def test_slug_allocation_query_count(self):
+        """Подбор slug стоит одного запроса по префиксу."""
+        Note.objects.create(title=self.TITLE, text='текст', author=self.user)
+        # Запрос по префиксу, точка сохранения, вставка, её освобождение.
+        with self.assertNumQueries(4):
+            Note.objects.create(
+                title=self.TITLE, text='текст', author=self.user
+            )
+
+    @skipUnless(connection.vendor == 'sqlite',
+                'План запроса проверяется через EXPLAIN QUERY PLAN SQLite.')
+    def test_slug_allocation_uses_index(self):
+        """Занятые slug ищутся диапазонами по индексу, а не LIKE."""
+        with CaptureQueriesContext(connection) as context:
+            find_taken_slugs(Note.objects, ('slug', 'a' * 100), 100)
+        sql, = (query['sql'] for query in context.captured_queries)
+        self.assertNotIn('LIKE', sql)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertFalse(
+            any(step.startswith('SCAN') for step in plan), plan
+        )
+
+    def test_slug_race_is_retried(self):
+        """Если slug успели занять, он подбирается заново."""
+        taken = Note.objects.create(
+            title=self.TITLE, text='текст', author=self.user
+        )
+        with mock.patch(
+                'notes.models.allocate_slug',
+                side_effect=[taken.slug, 'free-slug']
+        ):
+            note = Note.objects.create(
+                title=self.TITLE, text='текст', author=self.user
+            )
+        self.assertEqual(note.slug, 'free-slug')
+
+
 class TestNoteEdit(TestCase):
     """Тестирование редактирования заметки."""
 
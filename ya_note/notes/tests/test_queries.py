@@ -0,0 +1,145 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from common.query_budget import (
+    QueryBudget, QueryBudgetMixin, assert_query_budget
+)
+from notes import urls
+from notes.models import Note
+
+
+@skipUnless(connection.vendor == 'sqlite',
+            'План запроса проверяется через EXPLAIN QUERY PLAN SQLite.')
+class TestQueryPlans(TestCase):
+    """Запросы к заметкам должны использовать индексы."""
+
+    SLUG = 'slug'
+    AUTHOR = 'автор_заметки'
+
+    URLS = (
+        reverse('notes:list'),
+        reverse('notes:detail', args=(SLUG,)),
+        reverse('notes:edit', args=(SLUG,)),
+        reverse('notes:delete', args=(SLUG,)),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username=cls.AUTHOR)
+        cls.note = Note.objects.create(title='заголовок', text='текст',
+                                       slug=cls.SLUG, author=cls.author)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    @staticmethod
+    def explain(sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_hot_queries_use_indexes(self):
+        """Запросы заметок автора не сканируют таблицу целиком."""
+        for url in self.URLS:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    self.author_client.get(url)
+                queries = [
+                    query['sql'] for query in context.captured_queries
+                    if '"notes_note"' in query['sql']
+                ]
+                self.assertTrue(queries)
+                for sql in queries:
+                    plan = self.explain(sql)
+                    self.assertTrue(
+                        any('INDEX' in step for step in plan), (sql, plan)
+                    )
+                    self.assertFalse(
+                        any(step.startswith('SCAN') and 'INDEX' not in step
+                            for step in plan),
+                        (sql, plan)
+                    )
+
+
+class TestQueryBudgets(QueryBudgetMixin, TestCase):
+    """Страницы приложения укладываются в бюджет SQL-запросов."""
+
+    SLUG = 'slug'
+    AUTHOR = 'автор_заметки'
+
+    query_budgets = {
+        'notes:home': QueryBudget(max_queries=2, max_time=0.05),
+        'notes:add': QueryBudget(max_queries=2, max_time=0.05),
+        'notes:edit': QueryBudget(max_queries=3, max_time=0.05),
+        'notes:detail': QueryBudget(max_queries=4, max_time=0.05),
+        'notes:delete': QueryBudget(max_queries=3, max_time=0.05),
+        'notes:list': QueryBudget(max_queries=3, max_time=0.05),
+        'notes:success': QueryBudget(max_queries=2, max_time=0.05),
+        'notes:search': QueryBudget(max_queries=3, max_time=0.05),
+    }
+    ROUTES = (
+        ('notes:home', reverse('notes:home')),
+        ('notes:add', reverse('notes:add')),
+        ('notes:edit', reverse('notes:edit', args=(SLUG,))),
+        ('notes:detail', reverse('notes:detail', args=(SLUG,))),
+        ('notes:delete', reverse('notes:delete', args=(SLUG,))),
+        ('notes:list', reverse('notes:list')),
+        ('notes:success', reverse('notes:success')),
+        ('notes:search', reverse('notes:search') + '?q=текст'),
+    )
+    FORM_DATA = {'title': 'Новый заголовок', 'text': 'Новый текст'}
+    write_query_budgets = {
+        'notes:add': QueryBudget(max_queries=5, max_time=0.05),
+        'notes:edit': QueryBudget(max_queries=5, max_time=0.05),
+        'notes:delete': QueryBudget(max_queries=4, max_time=0.05),
+    }
+    # Заметка удаляется последней, после правки.
+    WRITE_ROUTES = (
+        ('notes:add', reverse('notes:add'), {**FORM_DATA, 'slug': 'new'}),
+        ('notes:edit', reverse('notes:edit', args=(SLUG,)),
+         {**FORM_DATA, 'slug': SLUG}),
+        ('notes:delete', reverse('notes:delete', args=(SLUG,)), {}),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username=cls.AUTHOR)
+        cls.note = Note.objects.create(title='заголовок', text='текст',
+                                       slug=cls.SLUG, author=cls.author)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_every_route_has_query_budget(self):
+        """Для каждого маршрута приложения объявлен бюджет запросов."""
+        route_names = {
+            f'{urls.app_name}:{pattern.name}' for pattern in urls.urlpatterns
+        }
+        self.assertEqual(route_names, set(self.query_budgets))
+        self.assertEqual(
+            route_names, {url_name for url_name, _ in self.ROUTES}
+        )
+
+    def test_route_query_budget(self):
+        """Страницы укладываются в бюджет SQL-запросов."""
+        for url_name, url in self.ROUTES:
+            with self.subTest(url_name=url_name):
+                with self.assert_url_budget(url_name):
+                    self.author_client.get(url)
+
+    def test_write_route_query_budget(self):
+        """Создание, правка и удаление заметки укладываются в бюджет."""
+        for url_name, url, data in self.WRITE_ROUTES:
+            with self.subTest(url_name=url_name):
+                with assert_query_budget(
+                    self.write_query_budgets[url_name], label=url_name
+                ):
+                    response = self.author_client.post(url, data)
+                self.assertRedirects(response, reverse('notes:success'))
@@ -0,0 +1,83 @@
+from importlib import import_module
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class TestProductionSettings(TestCase):
+    """Боевой профиль: подключения к SQLite и общий для процессов кеш."""
+
+    production = import_module('yanote.settings_production')
+
+    def test_connections_are_persistent(self):
+        """Подключение к базе переиспользуется между запросами."""
+        self.assertGreater(
+            self.production.DATABASES['default']['CONN_MAX_AGE'], 0
+        )
+
+    def test_cache_is_shared(self):
+        """Кеш не локальный для процесса, иначе версии не сбросятся."""
+        self.assertNotIn(
+            'locmem', self.production.CACHES['default']['BACKEND']
+        )
+
+    def test_sessions_cache_is_shared(self):
+        """Выход отзывает сессию во всех процессах, а не только в своём."""
+        sessions = self.production.CACHES[self.production.SESSION_CACHE_ALIAS]
+        self.assertNotIn('locmem', sessions['BACKEND'])
+        self.assertNotEqual(
+            sessions['KEY_PREFIX'],
+            self.production.CACHES['default'].get('KEY_PREFIX', '')
+        )
+
+    @skipUnless(connection.vendor == 'sqlite', 'Проверяются PRAGMA SQLite.')
+    def test_pragmas_applied_to_new_connection(self):
+        """Каждое новое подключение получает PRAGMA боевого профиля."""
+        with override_settings(SQLITE_PRAGMAS=self.production.SQLITE_PRAGMAS):
+            new_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                with new_connection.cursor() as cursor:
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(cursor.fetchone(), (5000,))
+                    cursor.execute('PRAGMA synchronous')
+                    self.assertEqual(cursor.fetchone(), (1,))
+            finally:
+                new_connection.close()
+
+
+class TestSessionBackends(TestCase):
+    """Профили хранилища сессий."""
+
+    AUTHOR = 'автор_заметки'
+    LIST_URL = reverse('notes:list')
+    SESSION_QUERIES = (
+        ('db', 1),
+        ('cached_db', 0),
+        ('signed_cookies', 0),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username=cls.AUTHOR)
+
+    def test_session_queries(self):
+        """Из кеша и cookie сессия читается без запросов к базе."""
+        for backend, session_queries in self.SESSION_QUERIES:
+            with self.subTest(backend=backend), override_settings(
+                SESSION_ENGINE=settings.SESSION_ENGINES[backend]
+            ):
+                client = Client()
+                client.force_login(self.author)
+                client.get(self.LIST_URL)
+                with CaptureQueriesContext(connection) as context:
+                    response = client.get(self.LIST_URL)
+                self.assertEqual(response.context['user'], self.author)
+                self.assertEqual(sum(
+                    '"django_session"' in query['sql']
+                    for query in context.captured_queries
+                ), session_queries)
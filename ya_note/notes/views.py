@@ -1,9 +1,16 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
 from .forms import NoteForm
 from .models import Note
+from .search import search_notes
+
+BAD_CURSOR = 'Некорректный параметр after.'
 
 
 class Home(generic.TemplateView):
@@ -50,10 +57,97 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список всех заметок пользователя.
+
+    Список разбит на страницы по id (keyset): страница начинается сразу за
+    последней показанной заметкой из параметра after, поэтому стоимость
+    запроса не зависит от номера страницы. Загружаются только колонки,
+    которые выводит шаблон.
+    """
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        """
+        Заметки страницы и ещё одна сверх неё.
+
+        Лишняя заметка показывает, что следующая страница есть, без
+        отдельного запроса.
+        """
+        notes = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('pk')
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                notes = notes.filter(pk__gt=int(after))
+            except ValueError:
+                raise BadRequest(BAD_CURSOR)
+        return notes[:settings.NOTES_COUNT_ON_LIST_PAGE + 1]
+
+    def get_context_data(self, **kwargs):
+        page_size = settings.NOTES_COUNT_ON_LIST_PAGE
+        try:
+            notes = list(self.object_list)
+        except OverflowError:
+            # Число в after не помещается в целое базы данных.
+            raise BadRequest(BAD_CURSOR)
+        next_after = None
+        if len(notes) > page_size:
+            next_after = notes[page_size - 1].pk
+        return super().get_context_data(
+            object_list=notes[:page_size], next_after=next_after, **kwargs
+        )
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """
+    Поиск по заметкам пользователя.
+
+    Как и остальные представления, видит только заметки автора запроса.
+    Результаты упорядочены по релевантности, совпадения в снипетах
+    выделены.
+    """
+    template_name = 'notes/search.html'
 
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_notes(self.request.user, self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+def get_note_modified(request, slug, *args, **kwargs):
+    """
+    Время последнего изменения заметки пользователя.
+
+    Вычисляется одним запросом по индексу и запоминается в запросе,
+    чтобы ETag и Last-Modified не обращались к базе дважды.
+    """
+    if not request.user.is_authenticated:
+        return None
+    if not hasattr(request, 'note_modified'):
+        request.note_modified = Note.objects.filter(
+            author=request.user, slug=slug
+        ).values_list('modified', flat=True).first()
+    return request.note_modified
+
+
+def note_etag(request, slug, *args, **kwargs):
+    """Значение ETag для заметки: адрес и время изменения."""
+    modified = get_note_modified(request, slug)
+    if modified is None:
+        return None
+    return f'{slug}-{modified.timestamp()}'
+
+
+@method_decorator(
+    condition(etag_func=note_etag, last_modified_func=get_note_modified),
+    name='dispatch'
+)
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
@@ -0,0 +1,60 @@
+"""
+Профиль для боевого запуска.
+
+Выбирается переменной окружения:
+
+    DJANGO_SETTINGS_MODULE=yanote.settings_production
+"""
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import CACHES, DATABASES, SECRET_KEY, SESSION_ENGINES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+).split(',')
+
+# Сессии по умолчанию читаются из кеша sessions, а не из базы.
+SESSION_ENGINE = SESSION_ENGINES[
+    os.environ.get('DJANGO_SESSION_BACKEND', 'cached_db')
+]
+
+# Рабочих процессов несколько, а кеш сбрасывается сменой версий при
+# записи. Локальный кеш каждого процесса продолжал бы отдавать страницы
+# прежней версии, а сессию после выхода в одном процессе — отдавать из
+# кеша другого. Поэтому в бою оба кеша общие — memcached.
+MEMCACHED_LOCATION = os.environ.get(
+    'DJANGO_MEMCACHED_LOCATION', '127.0.0.1:11211'
+).split(',')
+CACHES = {
+    **CACHES,
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': MEMCACHED_LOCATION,
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': MEMCACHED_LOCATION,
+        'KEY_PREFIX': 'sessions',
+    },
+}
+
+# Подключение живёт между запросами вместо открытия на каждый запрос.
+DATABASES = {
+    **DATABASES,
+    'default': {**DATABASES['default'], 'CONN_MAX_AGE': 600},
+}
+
+# WAL позволяет читать во время записи, synchronous=NORMAL в режиме WAL
+# сбрасывает данные на диск только на контрольных точках, а busy_timeout
+# заставляет ждать блокировку вместо ошибки «database is locked».
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
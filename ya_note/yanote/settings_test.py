@@ -0,0 +1,36 @@
+"""
+Профиль для запуска тестов.
+
+Быстрый хешер паролей, SQLite в памяти, локальный кеш и только то
+промежуточное ПО, от которого зависят тесты.
+"""
+from .settings import *  # noqa: F401, F403
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+# Бюджеты запросов в тестах рассчитаны на сессии в базе, какое бы
+# хранилище ни было выбрано в окружении.
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]